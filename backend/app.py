@@ -3,9 +3,13 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field, ValidationError
 from typing import List, Optional, Dict, Any, Union
+import atexit
 import base64
+import collections
 import io
 import os
+import threading
+import time
 import json
 import requests
 import re
@@ -84,7 +88,15 @@ Focus on topics like: sustainable food choices, reducing environmental impact, p
     except Exception as e:
         raise RuntimeError(f"Error calling Mistral API: {str(e)}")
 
-app = FastAPI(title="EcoBee Intake & Perception API", version="2.0.0")
+# Serialize endpoint responses with orjson when it is installed (stdlib json otherwise)
+try:
+    import orjson  # noqa: F401 - ORJSONResponse needs it at request time
+    from fastapi.responses import ORJSONResponse as DefaultJSONResponse
+except ImportError:
+    DefaultJSONResponse = JSONResponse
+
+app = FastAPI(title="EcoBee Intake & Perception API", version="2.0.0",
+              default_response_class=DefaultJSONResponse)
 
 # Enhanced CORS for development
 app.add_middleware(
@@ -305,7 +317,8 @@ def read_barcode_with_pixtral(image_bytes: bytes) -> Optional[str]:
         if matches:
             return matches[0]  # Return first valid barcode
         
-        if "none" in description.lower() or "no barcode" in description.lower():
+        description_lower = description.lower()
+        if "none" in description_lower or "no barcode" in description_lower:
             return None
             
         return None
@@ -377,7 +390,7 @@ async def enhanced_intake(
         
         # Save to Supabase if available
         try:
-            if SUPABASE_CLIENT and request_obj.quiz_responses:
+            if QUIZ_RESULT_BATCHER and request_obj.quiz_responses:
                 # Generate a unique record ID
                 record_id = str(uuid.uuid4())
                 
@@ -412,16 +425,16 @@ async def enhanced_intake(
                 # Generate unique dummy user ID to avoid collisions
                 dummy_user_id = f"anonymous_user_{uuid.uuid4().hex[:8]}"
                 
-                # Insert into Supabase
-                result = SUPABASE_CLIENT.table("quiz_results").insert({
+                # Queue for the next batched insert into Supabase
+                QUIZ_RESULT_BATCHER.add({
                     "id": record_id,
                     "dummy_user_id": dummy_user_id,  # Use correct column name and unique ID
                     "quiz_responses": quiz_responses_data,
                     "scoring_result": scoring_result_data,
                     "user_metadata": user_metadata
-                }).execute()
+                })
                 
-                print(f"✅ Quiz results saved to Supabase with ID: {record_id}, dummy_user_id: {dummy_user_id}")
+                print(f"✅ Quiz results queued for Supabase with ID: {record_id}, dummy_user_id: {dummy_user_id}")
                 
         except Exception as supabase_error:
             print(f"⚠️ Warning: Could not save to Supabase: {supabase_error}")
@@ -776,6 +789,74 @@ if SUPABASE_URL and SUPABASE_KEY:
 else:
     print("⚠️ SUPABASE_URL or SUPABASE_KEY not set; Supabase integrations disabled")
 
+# Intake results are inserted in batches: one round-trip per QUIZ_RESULT_BATCH_SIZE
+# rows, or after QUIZ_RESULT_MAX_WAIT_MS once the first row is queued
+QUIZ_RESULT_BATCH_SIZE = 50
+QUIZ_RESULT_MAX_WAIT_MS = int(os.getenv("QUIZ_RESULT_MAX_WAIT_MS", "200"))
+# Pause before retrying a failed batch insert (seconds)
+QUIZ_RESULT_RETRY_DELAY = 0.5
+
+class QuizResultBatcher:
+    """Buffer quiz_results rows and insert them from a background thread in batches"""
+    
+    def __init__(self, client, batch_size: int = QUIZ_RESULT_BATCH_SIZE,
+                 max_wait_ms: int = QUIZ_RESULT_MAX_WAIT_MS):
+        self.client = client
+        self.batch_size = batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._rows = collections.deque()
+        self._ready = threading.Condition()
+        threading.Thread(target=self._run, name="quiz-results-flusher", daemon=True).start()
+        # Write whatever is still queued when the server shuts down
+        atexit.register(self.flush)
+    
+    def add(self, row: Dict[str, Any]):
+        """Queue one quiz_results row; returns immediately"""
+        with self._ready:
+            self._rows.append(row)
+            self._ready.notify()
+    
+    def _run(self):
+        while True:
+            with self._ready:
+                # Sleep until a row arrives, then give the batch up to max_wait to fill
+                self._ready.wait_for(lambda: self._rows)
+                self._ready.wait_for(lambda: len(self._rows) >= self.batch_size, timeout=self.max_wait)
+            self.flush()
+    
+    def flush(self):
+        """Insert all queued rows, batch_size rows per request"""
+        while True:
+            with self._ready:
+                batch = [self._rows.popleft() for _ in range(min(len(self._rows), self.batch_size))]
+            if not batch:
+                return
+            self._insert_batch(batch)
+    
+    def _insert_batch(self, batch: List[Dict[str, Any]]):
+        """Insert one batch; on failure retry once, then fall back to row-by-row inserts"""
+        for attempt in range(2):
+            try:
+                self.client.table("quiz_results").insert(batch).execute()
+                print(f"✅ Saved {len(batch)} quiz result(s) to Supabase")
+                return
+            except Exception as e:
+                print(f"⚠️ Warning: Batch insert of {len(batch)} quiz result(s) failed (attempt {attempt + 1}): {e}")
+                if attempt == 0:
+                    time.sleep(QUIZ_RESULT_RETRY_DELAY)
+        
+        # Isolate the bad rows so one duplicate id or schema violation doesn't lose the rest
+        saved = 0
+        for row in batch:
+            try:
+                self.client.table("quiz_results").insert(row).execute()
+                saved += 1
+            except Exception as e:
+                print(f"❌ Lost quiz result {row.get('id')}: {e}")
+        print(f"✅ Saved {saved}/{len(batch)} quiz result(s) to Supabase row by row")
+
+QUIZ_RESULT_BATCHER = QuizResultBatcher(SUPABASE_CLIENT) if SUPABASE_CLIENT else None
+
 
 @app.post('/api/save-results')
 async def save_results(payload: Dict):
@@ -6,12 +6,17 @@ with comprehensive product sustainability analysis
 """
 
 import base64
+import functools
 import io
 import json
 import os
-from typing import Optional, Dict, Any, Tuple, List
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple, List, Union, BinaryIO
 from PIL import Image
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 
 # Load environment variables from .env.local file
@@ -25,16 +30,61 @@ except ImportError as e:
     print(f"⚠️  Product sustainability analyzer not available: {e}")
     SUSTAINABILITY_ANALYZER_AVAILABLE = False
 
+class TTLCache:
+    """Small thread-safe cache whose entries expire after `ttl` seconds
+    
+    When full, the least recently stored entry is evicted first.
+    """
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Any, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                return default
+            return value
+    
+    def __setitem__(self, key, value):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+# Product sustainability is effectively static for minutes at a time - share lookups
+# across scanner instances so repeat scans skip the upstream product databases
+_sustainability_cache = TTLCache(maxsize=4096, ttl=120)
+
+@functools.lru_cache(maxsize=1)
+def _default_http_session() -> requests.Session:
+    """Process-wide pooled session so Pixtral calls reuse warm TLS connections"""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=20)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
 class PixtralBarcodeScanner:
     """Barcode scanner using Mistral's Pixtral vision model"""
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(self, api_key: Optional[str] = None, http_session: Optional[requests.Session] = None):
         """Initialize the Pixtral barcode scanner
         
         Args:
             api_key: Mistral API key. If None, will try to get from environment
+            http_session: Session for Pixtral calls. If None, the shared pooled session is used
         """
         self.api_key = api_key or os.getenv('MISTRAL_API_KEY')
+        self.http = http_session or _default_http_session()
         if not self.api_key:
             print("⚠️  Warning: No Mistral API key found. Please check your .env.local file or set MISTRAL_API_KEY environment variable")
         
@@ -50,11 +100,11 @@ class PixtralBarcodeScanner:
             except Exception as e:
                 print(f"⚠️  Failed to initialize sustainability analyzer: {e}")
         
-    def scan_barcode_from_image(self, image_data: bytes, product_type: str = "food") -> Dict[str, Any]:
+    def scan_barcode_from_image(self, image_data: Union[bytes, BinaryIO], product_type: str = "food") -> Dict[str, Any]:
         """Scan barcode from image bytes
         
         Args:
-            image_data: Raw image bytes
+            image_data: Raw image bytes, or a binary file object positioned at the image
             product_type: Expected product type ("food" or "clothing")
             
         Returns:
@@ -62,7 +112,7 @@ class PixtralBarcodeScanner:
         """
         try:
             # Convert image bytes to PIL Image
-            image = Image.open(io.BytesIO(image_data))
+            image = Image.open(image_data if hasattr(image_data, 'read') else io.BytesIO(image_data))
             
             # Convert to base64 for API
             base64_image = self._image_to_base64(image)
@@ -91,7 +141,8 @@ class PixtralBarcodeScanner:
                         barcode_result["product_info"]["name"] = sustainability_info.get("name", barcode_result["product_info"].get("name", "Unknown"))
                         barcode_result["product_info"]["brand"] = sustainability_info.get("brand", barcode_result["product_info"].get("brand", "Unknown"))
                         # Update category to be more specific for quiz logic
-                        if "snack" in sustainability_info.get("category", "").lower() or "sweet" in sustainability_info.get("category", "").lower() or "candy" in sustainability_info.get("category", "").lower():
+                        category_lower = sustainability_info.get("category", "").lower()
+                        if "snack" in category_lower or "sweet" in category_lower or "candy" in category_lower:
                             barcode_result["product_info"]["category"] = "Processed/Packaged"
                         else:
                             barcode_result["product_info"]["category"] = sustainability_info.get("category", barcode_result["product_info"].get("category", "Food"))
@@ -239,7 +290,7 @@ class PixtralBarcodeScanner:
                 "temperature": 0.1
             }
             
-            response = requests.post(self.api_url, headers=headers, json=payload, timeout=30)
+            response = self.http.post(self.api_url, headers=headers, json=payload, timeout=30)
             
             if response.status_code == 200:
                 result = response.json()
@@ -309,12 +360,14 @@ class PixtralBarcodeScanner:
                 "product_info": None
             }
     
-    def _get_product_sustainability(self, barcode: str, product_type: str = "food") -> Optional[Dict[str, Any]]:
+    def _get_product_sustainability(self, barcode: str, product_type: str = "food",
+                                    use_cache: bool = True) -> Optional[Dict[str, Any]]:
         """Get comprehensive product sustainability information
         
         Args:
             barcode: Product barcode number
             product_type: Type of product ("food" or "clothing")
+            use_cache: Serve/store the result in the shared 2-minute cache
             
         Returns:
             Dictionary with sustainability analysis or None
@@ -322,6 +375,20 @@ class PixtralBarcodeScanner:
         if not self.sustainability_analyzer:
             return None
         
+        cache_key = (barcode, product_type)
+        if use_cache:
+            cached = _sustainability_cache.get(cache_key)
+            if cached is not None:
+                return dict(cached)
+        
+        sustainability_info = self._lookup_product_sustainability(barcode, product_type)
+        if sustainability_info:
+            _sustainability_cache[cache_key] = sustainability_info
+            return dict(sustainability_info)
+        return None
+    
+    def _lookup_product_sustainability(self, barcode: str, product_type: str) -> Optional[Dict[str, Any]]:
+        """Build the sustainability dict from the analyzer (uncached)"""
         try:
             product_info = self.sustainability_analyzer.get_product_info(barcode, product_type)
             
@@ -344,7 +411,7 @@ class PixtralBarcodeScanner:
                         "improvement_suggestions": product_info.sustainability_score.improvement_suggestions
                     },
                     "price_range": product_info.price_range,
-                    "alternatives": product_info.alternatives,
+                    "alternatives": [dict(alternative) for alternative in product_info.alternatives],
                     "eco_rating": self._get_eco_rating(product_info.sustainability_score.overall_score),
                     "environmental_tips": self._get_environmental_tips(product_info.category),
                     # Category detection fields
@@ -405,6 +472,6 @@ class PixtralBarcodeScanner:
                 "Consider secondhand or refurbished alternatives"
             ]
 
-def create_scanner() -> PixtralBarcodeScanner:
+def create_scanner(http_session: Optional[requests.Session] = None) -> PixtralBarcodeScanner:
     """Create a new barcode scanner instance"""
-    return PixtralBarcodeScanner()
+    return PixtralBarcodeScanner(http_session=http_session)
@@ -4,6 +4,7 @@ import csv
 from typing import Dict, List, Tuple, Optional
 from pathlib import Path
 from dataclasses import dataclass
+import numpy as np
 
 # Enhanced Planetary Boundaries EcoScore Engine
 # Full implementation of Stockholm Resilience Centre framework
@@ -282,6 +283,10 @@ FACTOR_TABLES = {
     }
 }
 
+# Boundary order and weights as arrays for the vectorized averages in calculate_ecoscore
+_BOUNDARY_KEYS = tuple(PLANETARY_BOUNDARIES)
+_BOUNDARY_WEIGHTS = np.array([config.weight for config in PLANETARY_BOUNDARIES.values()])
+
 def normalize_boundary_score(raw_score: float, boundary_key: str) -> float:
     """
     Normalize boundary score to 0-100 scale using scientific thresholds
@@ -326,38 +331,21 @@ def calculate_ecoscore(items: List[Dict], context: Optional[Dict] = None) -> Dic
         return create_default_ecoscore()
     
     # Score each item across all boundaries
-    scored_items = []
-    boundary_scores = {boundary: [] for boundary in PLANETARY_BOUNDARIES.keys()}
+    scored_items = [score_item(item) for item in items]
     
-    for item in items:
-        scored_item = score_item(item)
-        scored_items.append(scored_item)
-        
-        # Collect boundary scores for averaging
-        for boundary in PLANETARY_BOUNDARIES.keys():
-            if boundary in scored_item:
-                boundary_scores[boundary].append(scored_item[boundary])
-    
-    # Calculate per-boundary averages
-    per_boundary_averages = {}
-    for boundary, scores in boundary_scores.items():
-        if scores:
-            per_boundary_averages[boundary] = sum(scores) / len(scores)
-        else:
-            per_boundary_averages[boundary] = 50.0  # Default neutral score
+    # score_item fills in every boundary, so the scores form a dense
+    # (n_items, n_boundaries) matrix that numpy averages column-wise in one pass
+    boundary_matrix = np.fromiter(
+        (scored_item[boundary] for scored_item in scored_items for boundary in _BOUNDARY_KEYS),
+        dtype=np.float64, count=len(scored_items) * len(_BOUNDARY_KEYS)
+    ).reshape(len(scored_items), len(_BOUNDARY_KEYS))
+    boundary_averages = boundary_matrix.mean(axis=0)
+    per_boundary_averages = dict(zip(_BOUNDARY_KEYS, boundary_averages.tolist()))
     
     # Calculate weighted composite score
-    composite_score = 0.0
-    total_weight = 0.0
-    
-    for boundary_key, boundary_config in PLANETARY_BOUNDARIES.items():
-        if boundary_key in per_boundary_averages:
-            weighted_score = per_boundary_averages[boundary_key] * boundary_config.weight
-            composite_score += weighted_score
-            total_weight += boundary_config.weight
-    
+    total_weight = _BOUNDARY_WEIGHTS.sum()
     if total_weight > 0:
-        composite_score = composite_score / total_weight
+        composite_score = float(boundary_averages @ _BOUNDARY_WEIGHTS / total_weight)
     else:
         composite_score = 50.0
     
@@ -441,10 +441,10 @@ class ProductDatabase:
             "unique_users": len(self.leaderboard_entries),
             "average_sessions_per_user": round(sum(session_counts) / len(session_counts), 1),
             "score_distribution": {
-                "excellent": len([s for s in scores if s <= 30]),
-                "good": len([s for s in scores if 30 < s <= 50]),
-                "average": len([s for s in scores if 50 < s <= 70]),
-                "needs_improvement": len([s for s in scores if s > 70])
+                "excellent": sum(1 for s in scores if s <= 30),
+                "good": sum(1 for s in scores if 30 < s <= 50),
+                "average": sum(1 for s in scores if 50 < s <= 70),
+                "needs_improvement": sum(1 for s in scores if s > 70)
             },
             "last_updated": datetime.now().isoformat()
         }
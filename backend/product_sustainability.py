@@ -7,14 +7,233 @@ This module provides comprehensive product information and sustainability scorin
 import requests
 import json
 import os
+import functools
+import re
+import string
+import textwrap
+import threading
 import time
-from typing import Optional, Dict, Any, List
+import types
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional, Dict, Any, List, Mapping, Sequence, Tuple
 from dataclasses import dataclass
+import numpy as np
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# Prefer orjson for decoding the (often 100 KB+) product payloads when installed
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
 
 # Load environment variables
 load_dotenv(dotenv_path=".env.local")
 
+# Upper bound on concurrent lookups issued by get_products_info
+_MAX_LOOKUP_WORKERS = 8
+
+# Open Food Facts / UPCitemdb hits are kept for a day (LRU beyond the size cap)
+_SOURCE_CACHE_TTL = 86400
+_SOURCE_CACHE_MAX_SIZE = 4096
+
+def _ttl_cached_lookup(method):
+    """Memoize a successful per-barcode source lookup for _SOURCE_CACHE_TTL seconds"""
+    @functools.wraps(method)
+    def wrapper(self, barcode: str) -> Optional[Dict[str, Any]]:
+        key = (method.__name__, barcode)
+        with self._source_cache_lock:
+            entry = self._source_cache.get(key)
+            if entry is not None and time.monotonic() - entry[0] < _SOURCE_CACHE_TTL:
+                self._source_cache.move_to_end(key)
+                # Callers enrich the returned dict, so hand out copies
+                return dict(entry[1])
+        
+        result = method(self, barcode)
+        # Misses aren't cached: None also covers timeouts and upstream errors
+        if result is not None:
+            with self._source_cache_lock:
+                self._source_cache[key] = (time.monotonic(), dict(result))
+                self._source_cache.move_to_end(key)
+                if len(self._source_cache) > _SOURCE_CACHE_MAX_SIZE:
+                    self._source_cache.popitem(last=False)
+        return result
+    return wrapper
+
+# Food indicators
+_FOOD_KEYWORDS: frozenset = frozenset({
+    'food', 'snack', 'drink', 'beverage', 'meal', 'nutrition', 'organic',
+    'juice', 'water', 'soda', 'cookie', 'bread', 'milk', 'cheese',
+    'meat', 'vegetable', 'fruit', 'cereal', 'pasta', 'rice', 'coffee',
+    'tea', 'chocolate', 'candy', 'sauce', 'soup', 'frozen', 'fresh'
+})
+
+# Clothing indicators
+_CLOTHING_KEYWORDS: frozenset = frozenset({
+    'clothing', 'apparel', 'shirt', 'pants', 'dress', 'jacket', 'sweater',
+    'jeans', 'shorts', 'skirt', 'blouse', 'hoodie', 'coat', 'vest',
+    'underwear', 'socks', 'fashion', 'textile', 'fabric', 'cotton',
+    'polyester', 'wool', 'silk', 'denim', 'leather', 'shoes', 'boots'
+})
+
+# Common clothing materials (a tuple so extracted materials keep a stable order)
+_MATERIAL_KEYWORDS = (
+    'cotton', 'polyester', 'wool', 'silk', 'linen', 'denim', 'leather',
+    'nylon', 'spandex', 'elastane', 'rayon', 'viscose', 'bamboo',
+    'hemp', 'cashmere', 'alpaca', 'mohair', 'acrylic', 'fleece'
+)
+
+# Known sustainable clothing brands and their ratings
+_SUSTAINABLE_BRANDS: Mapping[str, Dict[str, Any]] = types.MappingProxyType({
+    'patagonia': {'sustainability_rating': 'A+', 'certifications': ['B-Corp', 'Fair Trade', 'Organic Cotton']},
+    'eileen fisher': {'sustainability_rating': 'A', 'certifications': ['B-Corp', 'Organic Cotton']},
+    'reformation': {'sustainability_rating': 'A', 'certifications': ['Sustainable Packaging']},
+    'everlane': {'sustainability_rating': 'B+', 'certifications': ['Ethical Manufacturing']},
+    'levi\'s': {'sustainability_rating': 'B', 'certifications': ['Water<Less', 'Organic Cotton']},
+    'h&m': {'sustainability_rating': 'C+', 'certifications': ['Conscious Collection', 'Organic Cotton']},
+    'zara': {'sustainability_rating': 'C', 'certifications': ['Join Life Collection']},
+    'uniqlo': {'sustainability_rating': 'B-', 'certifications': ['Recycled Materials']},
+    'nike': {'sustainability_rating': 'B', 'certifications': ['Move to Zero', 'Recycled Materials']},
+    'adidas': {'sustainability_rating': 'B+', 'certifications': ['Primegreen', 'Ocean Plastic']}
+})
+
+# Punctuation/digits become token separators, so a plain str.split() tokenizes
+_TOKEN_SEPARATORS = str.maketrans(dict.fromkeys(string.punctuation + string.digits, ' '))
+
+# Keyword token sets including simple plurals ("beverages", "shirts")
+_FOOD_TOKENS = _FOOD_KEYWORDS | {keyword + 's' for keyword in _FOOD_KEYWORDS}
+_CLOTHING_TOKENS = _CLOTHING_KEYWORDS | {keyword + 's' for keyword in _CLOTHING_KEYWORDS}
+
+
+@functools.lru_cache(maxsize=4096)
+def _detect_category_from_text(name: str, category: str, description: str,
+                               has_ingredients: bool, has_materials: bool) -> str:
+    """Classify lowercase product text as food/clothing/unknown (memoized per product)"""
+    tokens = set(f"{name} {category} {description}".translate(_TOKEN_SEPARATORS).split())
+    
+    # Having ingredients/materials strongly suggests food/clothing
+    food_score = len(tokens & _FOOD_TOKENS) + 2 * has_ingredients
+    clothing_score = len(tokens & _CLOTHING_TOKENS) + 2 * has_materials
+    
+    if food_score > clothing_score:
+        return "food"
+    elif clothing_score > food_score:
+        return "clothing"
+    else:
+        return "unknown"
+
+# Fallback clothing scoring heuristics
+_SUSTAINABLE_MATERIALS = ('organic cotton', 'hemp', 'linen', 'bamboo', 'recycled polyester')
+_FAST_FASHION_BRANDS = ('shein', 'fashion nova', 'forever 21', 'primark')
+_BRAND_RATING_BONUS: Mapping[str, int] = types.MappingProxyType({'A+': 25, 'A': 20, 'B+': 15, 'B': 10})
+
+_CLOTHING_FALLBACK_SUGGESTIONS = (
+    "Look for clothing made from organic or recycled materials",
+    "Choose brands with transparent sustainability practices",
+    "Consider the garment's durability and timeless design",
+    "Support brands with fair labor certifications",
+    "Explore clothing rental or second-hand options"
+)
+
+def _alternatives(*pairs: Tuple[str, str]) -> Tuple[Mapping[str, str], ...]:
+    """Freeze (name, reason) pairs into read-only alternatives shared by all lookups"""
+    return tuple(types.MappingProxyType({"name": name, "reason": reason}) for name, reason in pairs)
+
+# Generic sustainable alternatives by product category
+_FOOD_ALTS = _alternatives(
+    ("Organic equivalent", "Reduced pesticide use"),
+    ("Local/regional brand", "Lower transportation emissions"),
+    ("Bulk/refillable option", "Reduced packaging waste")
+)
+_CLEANING_ALTS = _alternatives(
+    ("Eco-friendly cleaning products", "Biodegradable ingredients"),
+    ("Concentrated formulas", "Less packaging and transportation"),
+    ("Refillable containers", "Reduced plastic waste")
+)
+_PERSONAL_CARE_ALTS = _alternatives(
+    ("Natural/organic cosmetics", "Fewer synthetic chemicals"),
+    ("Solid/bar alternatives", "Plastic-free packaging"),
+    ("Refillable containers", "Reduced packaging waste")
+)
+_GENERIC_ALTS = _alternatives(
+    ("Eco-certified alternative", "Third-party sustainability verification"),
+    ("Minimal packaging option", "Reduced waste"),
+    ("Local/regional brand", "Lower carbon footprint")
+)
+
+# Splits comma separated OpenFoodFacts lists into already-trimmed tokens
+_LIST_SPLIT = re.compile(r'\s*,\s*')
+
+# Product lookups are idempotent GETs: retry timeouts, dropped connections and
+# 429/5xx with exponential backoff before falling back to default scores
+_LOOKUP_RETRY = Retry(
+    total=2,
+    backoff_factor=0.2,
+    status_forcelist=(429, 500, 502, 503, 504),
+    allowed_methods=frozenset({'GET'}),
+    raise_on_status=False
+)
+
+# Mistral completions are billed POSTs: only retry when the connection was never
+# established, so a request that reached the API is never sent twice
+_MISTRAL_RETRY = Retry(
+    total=2,
+    connect=2,
+    read=0,
+    status=0,
+    backoff_factor=0.2,
+    raise_on_status=False
+)
+
+# After the scored JSON object has arrived, read at most this much of the remaining
+# event stream so the connection can go back to the pool; longer tails are dropped
+_STREAM_DRAIN_LIMIT = 16384
+
+def _create_http_session(mistral_url: str) -> requests.Session:
+    """Create a pooled HTTP session with per-upstream retry policies"""
+    session = requests.Session()
+    lookup_adapter = HTTPAdapter(max_retries=_LOOKUP_RETRY)
+    session.mount('https://', lookup_adapter)
+    session.mount('http://', lookup_adapter)
+    # Longest prefix wins, so Mistral calls get the connect-only policy
+    session.mount(mistral_url, HTTPAdapter(max_retries=_MISTRAL_RETRY))
+    return session
+
+class _JsonObjectTracker:
+    """Track brace depth across streamed text to spot when the first JSON object closes"""
+    
+    def __init__(self):
+        self.depth = 0
+        self.started = False
+        self.in_string = False
+        self.escaped = False
+    
+    def feed(self, text: str) -> bool:
+        """Consume a chunk of text; returns True once the top-level object is complete"""
+        for char in text:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                elif char == '\\':
+                    self.escaped = True
+                elif char == '"':
+                    self.in_string = False
+            elif char == '{':
+                self.depth += 1
+                self.started = True
+            elif not self.started:
+                continue
+            elif char == '"':
+                self.in_string = True
+            elif char == '}':
+                self.depth -= 1
+                if self.depth == 0:
+                    return True
+        return False
+
 @dataclass
 class SustainabilityScore:
     """Sustainability scoring for a product"""
@@ -38,18 +257,116 @@ class ProductInfo:
     ingredients: List[str]
     sustainability_score: SustainabilityScore
     price_range: str
-    alternatives: List[Dict[str, str]]  # Suggested eco-friendly alternatives
+    alternatives: Sequence[Mapping[str, str]]  # Suggested eco-friendly alternatives (shared, read-only)
 
 class ProductSustainabilityAnalyzer:
     """Analyze product sustainability using multiple data sources"""
     
+    # Prompt templates are parsed once; only substitute() runs per request
+    _FOOD_PROMPT_TEMPLATE = string.Template(textwrap.dedent("""
+        Analyze the sustainability of this product and provide detailed scoring:
+
+        Product Information:
+        - Name: $name
+        - Brand: $brand
+        - Category: $category
+        - Ingredients: $ingredients
+        - Labels/Certifications: $labels
+        - Packaging: $packaging
+        - Barcode: $barcode
+
+        Please provide a comprehensive sustainability analysis in JSON format:
+        {
+            "overall_score": 0-100,
+            "environmental_impact": 0-100,
+            "carbon_footprint": 0-100,
+            "packaging_score": 0-100,
+            "recyclability": 0-100,
+            "ethical_sourcing": 0-100,
+            "certifications": ["list of eco certifications found"],
+            "improvement_suggestions": ["specific suggestions for consumers"],
+            "analysis_reasoning": "detailed explanation of scoring",
+            "eco_friendly_level": "Poor/Fair/Good/Excellent",
+            "key_concerns": ["main environmental concerns"],
+            "positive_aspects": ["environmentally positive aspects"]
+        }
+
+        Base your analysis on:
+        1. Ingredient sustainability (organic, locally sourced, etc.)
+        2. Packaging materials and recyclability
+        3. Brand's environmental track record
+        4. Carbon footprint considerations
+        5. Ethical sourcing practices
+        6. Certifications (organic, fair trade, etc.)
+        7. End-of-life disposal impact
+
+        Be thorough and provide actionable insights for environmentally conscious consumers.
+        """))
+    
+    _CLOTHING_PROMPT_TEMPLATE = string.Template(textwrap.dedent("""
+        Analyze the sustainability of this clothing/textile product and provide detailed scoring:
+
+        Product Information:
+        - Name: $name
+        - Brand: $brand
+        - Category: $category
+        - Materials: $materials
+        - Brand Sustainability Rating: $brand_rating
+        - Brand Certifications: $brand_certifications
+
+        Please analyze and provide scores (0-100) for:
+
+        1. **Overall Sustainability Score** (0-100)
+        2. **Environmental Impact** (0-100) - Consider material production, dyeing, manufacturing
+        3. **Carbon Footprint** (0-100) - Manufacturing, transportation, packaging
+        4. **Labor Practices** (0-100) - Fair wages, working conditions, ethical sourcing
+        5. **Material Sustainability** (0-100) - Organic, recycled, biodegradable materials
+        6. **Durability & Longevity** (0-100) - Quality, repairability, timeless design
+        7. **End-of-Life** (0-100) - Recyclability, biodegradability, take-back programs
+
+        Also provide:
+        - List of positive certifications found
+        - 3-5 specific improvement suggestions for more sustainable clothing choices
+        - Alternative sustainable brands/products
+
+        Consider these sustainability factors:
+        - Organic or recycled materials (cotton, polyester, etc.)
+        - Fair Trade and ethical labor certifications
+        - Low-impact dyes and manufacturing processes
+        - Circular economy practices (take-back programs, recycling)
+        - Brand transparency and sustainability commitments
+        - Fast fashion vs. slow fashion approach
+
+        Format as JSON with exact keys: overall_score, environmental_impact, carbon_footprint, 
+        labor_practices, material_sustainability, durability, end_of_life, certifications, improvement_suggestions, alternatives
+        """))
+    
     def __init__(self):
         self.mistral_api_key = os.getenv('MISTRAL_API_KEY')
         self.mistral_url = "https://api.mistral.ai/v1/chat/completions"
         
+        # Shared session: keeps connections alive and retries transient failures
+        self.http = _create_http_session(self.mistral_url)
+        
+        # Resolve AI availability and request headers once instead of per call
+        self._ai_enabled = bool(self.mistral_api_key)
+        self._headers = {
+            'Authorization': f'Bearer {self.mistral_api_key}',
+            'Content-Type': 'application/json'
+        } if self._ai_enabled else {}
+        
         # Cache for API responses to avoid repeated calls
         self.cache = {}
         
+        # Lookups currently in progress, so concurrent callers for the same
+        # barcode wait for one result instead of repeating the upstream calls
+        self._inflight: Dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        
+        # Raw Open Food Facts / UPCitemdb results, see _ttl_cached_lookup
+        self._source_cache: OrderedDict = OrderedDict()
+        self._source_cache_lock = threading.Lock()
+        
     def get_product_info(self, barcode: str, product_type: str = "food") -> Optional[ProductInfo]:
         """Get comprehensive product information and sustainability analysis
         
@@ -60,15 +377,55 @@ class ProductSustainabilityAnalyzer:
         Returns:
             ProductInfo object with sustainability analysis or None
         """
-        try:
-            print(f"🔍 Starting {product_type} product lookup for barcode: {barcode}")
-            
-            # Check cache first
-            cache_key = f"product_{product_type}_{barcode}"
+        print(f"🔍 Starting {product_type} product lookup for barcode: {barcode}")
+        
+        # Check cache first
+        cache_key = f"product_{product_type}_{barcode}"
+        if cache_key in self.cache:
+            print(f"💾 Found in cache for barcode: {barcode}")
+            return self.cache[cache_key]
+        
+        # Coalesce concurrent lookups of the same barcode
+        with self._inflight_lock:
+            # The owner caches its result before leaving _inflight, so re-check here
+            # to avoid a second lookup starting just after the first one finished
             if cache_key in self.cache:
-                print(f"💾 Found in cache for barcode: {barcode}")
                 return self.cache[cache_key]
-            
+            future = self._inflight.get(cache_key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                self._inflight[cache_key] = future
+        
+        if not is_owner:
+            print(f"⏳ Waiting for in-flight lookup of barcode: {barcode}")
+            return future.result()
+        
+        try:
+            product_info = self._lookup_product_info(barcode, product_type, cache_key)
+        except BaseException as e:
+            # Waiters see the same outcome as the owner
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(product_info)
+            return product_info
+        finally:
+            with self._inflight_lock:
+                del self._inflight[cache_key]
+    
+    def get_products_info(self, barcodes: Sequence[str], product_type: str = "food") -> List[Optional[ProductInfo]]:
+        """Look up several barcodes concurrently; results keep the order of ``barcodes``"""
+        if len(barcodes) <= 1:
+            return [self.get_product_info(barcode, product_type) for barcode in barcodes]
+        
+        lookup = functools.partial(self.get_product_info, product_type=product_type)
+        with ThreadPoolExecutor(max_workers=min(_MAX_LOOKUP_WORKERS, len(barcodes))) as pool:
+            return list(pool.map(lookup, barcodes))
+    
+    def _lookup_product_info(self, barcode: str, product_type: str, cache_key: str) -> Optional[ProductInfo]:
+        """Fetch, analyze and cache product information (uncached path of get_product_info)"""
+        try:
             # Route to appropriate data source based on product type
             if product_type == "clothing":
                 basic_info = self._get_clothing_product_data(barcode)
@@ -95,8 +452,9 @@ class ProductSustainabilityAnalyzer:
                 }
             
             # Step 4: Detect and verify category
-            detected_category = self._detect_product_category(basic_info)
-            category_confidence = self._calculate_category_confidence(basic_info, product_type)
+            lowered = self._lowercase_fields(basic_info)
+            detected_category = self._detect_product_category(basic_info, lowered)
+            category_confidence = self._calculate_category_confidence(detected_category, product_type)
             
             print(f"🔍 Category detection - Expected: {product_type}, Detected: {detected_category}, Confidence: {category_confidence}")
             
@@ -117,7 +475,7 @@ class ProductSustainabilityAnalyzer:
                 ingredients=basic_info.get('ingredients', []),
                 sustainability_score=sustainability_analysis,
                 price_range=basic_info.get('price_range', 'Unknown'),
-                alternatives=self._get_sustainable_alternatives(basic_info)
+                alternatives=self._get_sustainable_alternatives(basic_info, lowered)
             )
             
             # Add category detection metadata
@@ -136,14 +494,15 @@ class ProductSustainabilityAnalyzer:
             print(f"Error getting product info for {barcode}: {e}")
             return None
     
+    @_ttl_cached_lookup
     def _get_openfoodfacts_data(self, barcode: str) -> Optional[Dict[str, Any]]:
         """Get product data from Open Food Facts API"""
         try:
             url = f"https://world.openfoodfacts.org/api/v0/product/{barcode}.json"
-            response = requests.get(url, timeout=10)
+            response = self.http.get(url, timeout=10)
             
             if response.status_code == 200:
-                data = response.json()
+                data = _json_loads(response.content)
                 
                 if data.get('status') == 1:  # Product found
                     product = data['product']
@@ -151,7 +510,7 @@ class ProductSustainabilityAnalyzer:
                     # Extract ingredients
                     ingredients = []
                     if 'ingredients_text' in product:
-                        ingredients = [ing.strip() for ing in product['ingredients_text'].split(',')]
+                        ingredients = [ing for ing in _LIST_SPLIT.split(product['ingredients_text'].strip()) if ing]
                     elif 'ingredients' in product:
                         ingredients = [ing.get('text', '') for ing in product['ingredients']]
                     
@@ -163,7 +522,7 @@ class ProductSustainabilityAnalyzer:
                         'ingredients': ingredients,
                         'nutriscore': product.get('nutriscore_grade', ''),
                         'ecoscore': product.get('ecoscore_grade', ''),
-                        'labels': product.get('labels', '').split(',') if product.get('labels') else [],
+                        'labels': [label for label in _LIST_SPLIT.split(product['labels'].strip()) if label] if product.get('labels') else [],
                         'packaging': product.get('packaging', ''),
                         'source': 'openfoodfacts'
                     }
@@ -174,16 +533,17 @@ class ProductSustainabilityAnalyzer:
             print(f"Error fetching from OpenFoodFacts: {e}")
             return None
     
+    @_ttl_cached_lookup
     def _get_upcitemdb_data(self, barcode: str) -> Optional[Dict[str, Any]]:
         """Get product data from UPCitemdb API"""
         try:
             url = f"https://api.upcitemdb.com/prod/trial/lookup"
             params = {'upc': barcode}
             
-            response = requests.get(url, params=params, timeout=10)
+            response = self.http.get(url, params=params, timeout=10)
             
             if response.status_code == 200:
-                data = response.json()
+                data = _json_loads(response.content)
                 
                 if data.get('code') == 'OK' and data.get('items'):
                     item = data['items'][0]
@@ -220,11 +580,11 @@ class ProductSustainabilityAnalyzer:
             
             if clothing_info:
                 # Enhance with clothing-specific categorization
-                category = clothing_info.get('category', '').lower()
-                if any(term in category for term in ['apparel', 'clothing', 'fashion', 'textile', 'wear']):
+                lowered = self._lowercase_fields(clothing_info)
+                if any(term in lowered['category'] for term in ['apparel', 'clothing', 'fashion', 'textile', 'wear']):
                     clothing_info['product_type'] = 'clothing'
                     clothing_info['materials'] = self._extract_materials_from_description(
-                        clothing_info.get('description', '') + ' ' + clothing_info.get('name', '')
+                        lowered['description'] + ' ' + lowered['name']
                     )
                     return clothing_info
             
@@ -240,19 +600,16 @@ class ProductSustainabilityAnalyzer:
             print(f"Error fetching clothing product data: {e}")
             return None
     
-    def _extract_materials_from_description(self, text: str) -> List[str]:
-        """Extract material information from product description"""
+    @staticmethod
+    def _lowercase_fields(product_data: Dict[str, Any]) -> Dict[str, str]:
+        """Lowercase the text fields once so detection helpers can share them"""
+        return {field: (product_data.get(field) or '').lower() for field in ('name', 'category', 'description')}
+    
+    def _extract_materials_from_description(self, text_lower: str) -> List[str]:
+        """Extract material information from an already lowercased product description"""
         materials = []
-        text_lower = text.lower()
-        
-        # Common clothing materials
-        material_keywords = [
-            'cotton', 'polyester', 'wool', 'silk', 'linen', 'denim', 'leather',
-            'nylon', 'spandex', 'elastane', 'rayon', 'viscose', 'bamboo',
-            'hemp', 'cashmere', 'alpaca', 'mohair', 'acrylic', 'fleece'
-        ]
         
-        for material in material_keywords:
+        for material in _MATERIAL_KEYWORDS:
             if material in text_lower:
                 materials.append(material.title())
         
@@ -268,22 +625,8 @@ class ProductSustainabilityAnalyzer:
             Dict with brand sustainability info
         """
         try:
-            # Known sustainable clothing brands and their ratings
-            sustainable_brands = {
-                'patagonia': {'sustainability_rating': 'A+', 'certifications': ['B-Corp', 'Fair Trade', 'Organic Cotton']},
-                'eileen fisher': {'sustainability_rating': 'A', 'certifications': ['B-Corp', 'Organic Cotton']},
-                'reformation': {'sustainability_rating': 'A', 'certifications': ['Sustainable Packaging']},
-                'everlane': {'sustainability_rating': 'B+', 'certifications': ['Ethical Manufacturing']},
-                'levi\'s': {'sustainability_rating': 'B', 'certifications': ['Water<Less', 'Organic Cotton']},
-                'h&m': {'sustainability_rating': 'C+', 'certifications': ['Conscious Collection', 'Organic Cotton']},
-                'zara': {'sustainability_rating': 'C', 'certifications': ['Join Life Collection']},
-                'uniqlo': {'sustainability_rating': 'B-', 'certifications': ['Recycled Materials']},
-                'nike': {'sustainability_rating': 'B', 'certifications': ['Move to Zero', 'Recycled Materials']},
-                'adidas': {'sustainability_rating': 'B+', 'certifications': ['Primegreen', 'Ocean Plastic']}
-            }
-            
             brand_lower = brand.lower()
-            for known_brand, info in sustainable_brands.items():
+            for known_brand, info in _SUSTAINABLE_BRANDS.items():
                 if known_brand in brand_lower or brand_lower in known_brand:
                     return {
                         'brand_sustainability': info,
@@ -299,54 +642,19 @@ class ProductSustainabilityAnalyzer:
     def _analyze_sustainability_with_ai(self, product_data: Dict[str, Any], barcode: str) -> SustainabilityScore:
         """Use Mistral AI to analyze product sustainability"""
         try:
-            if not self.mistral_api_key:
+            if not self._ai_enabled:
                 return self._create_fallback_sustainability_score()
             
-            # Create comprehensive prompt for sustainability analysis
-            prompt = f"""
-            Analyze the sustainability of this product and provide detailed scoring:
-
-            Product Information:
-            - Name: {product_data.get('name', 'Unknown')}
-            - Brand: {product_data.get('brand', 'Unknown')}
-            - Category: {product_data.get('category', 'Unknown')}
-            - Ingredients: {', '.join(product_data.get('ingredients', []))}
-            - Labels/Certifications: {', '.join(product_data.get('labels', []))}
-            - Packaging: {product_data.get('packaging', 'Unknown')}
-            - Barcode: {barcode}
-
-            Please provide a comprehensive sustainability analysis in JSON format:
-            {{
-                "overall_score": 0-100,
-                "environmental_impact": 0-100,
-                "carbon_footprint": 0-100,
-                "packaging_score": 0-100,
-                "recyclability": 0-100,
-                "ethical_sourcing": 0-100,
-                "certifications": ["list of eco certifications found"],
-                "improvement_suggestions": ["specific suggestions for consumers"],
-                "analysis_reasoning": "detailed explanation of scoring",
-                "eco_friendly_level": "Poor/Fair/Good/Excellent",
-                "key_concerns": ["main environmental concerns"],
-                "positive_aspects": ["environmentally positive aspects"]
-            }}
-
-            Base your analysis on:
-            1. Ingredient sustainability (organic, locally sourced, etc.)
-            2. Packaging materials and recyclability
-            3. Brand's environmental track record
-            4. Carbon footprint considerations
-            5. Ethical sourcing practices
-            6. Certifications (organic, fair trade, etc.)
-            7. End-of-life disposal impact
-
-            Be thorough and provide actionable insights for environmentally conscious consumers.
-            """
-            
-            headers = {
-                'Authorization': f'Bearer {self.mistral_api_key}',
-                'Content-Type': 'application/json'
-            }
+            # Fill in the precompiled prompt for sustainability analysis
+            prompt = self._FOOD_PROMPT_TEMPLATE.substitute(
+                name=product_data.get('name', 'Unknown'),
+                brand=product_data.get('brand', 'Unknown'),
+                category=product_data.get('category', 'Unknown'),
+                ingredients=', '.join(product_data.get('ingredients', [])),
+                labels=', '.join(product_data.get('labels', [])),
+                packaging=product_data.get('packaging', 'Unknown'),
+                barcode=barcode
+            )
             
             payload = {
                 "model": "mistral-large-latest",
@@ -360,12 +668,9 @@ class ProductSustainabilityAnalyzer:
                 "temperature": 0.3
             }
             
-            response = requests.post(self.mistral_url, headers=headers, json=payload, timeout=30)
+            content = self._request_mistral_content(payload)
             
-            if response.status_code == 200:
-                result = response.json()
-                content = result['choices'][0]['message']['content']
-                
+            if content:
                 try:
                     # Extract JSON from response
                     json_start = content.find('{')
@@ -397,55 +702,21 @@ class ProductSustainabilityAnalyzer:
     def _analyze_clothing_sustainability_with_ai(self, product_data: Dict[str, Any], barcode: str) -> SustainabilityScore:
         """Use Mistral AI to analyze clothing sustainability"""
         try:
-            if not self.mistral_api_key:
+            if not self._ai_enabled:
                 return self._create_fallback_clothing_sustainability_score(product_data)
             
-            # Create comprehensive prompt for clothing sustainability analysis
+            # Fill in the precompiled prompt for clothing sustainability analysis
             materials = product_data.get('materials', [])
             brand_sustainability = product_data.get('brand_sustainability', {})
             
-            prompt = f"""
-            Analyze the sustainability of this clothing/textile product and provide detailed scoring:
-
-            Product Information:
-            - Name: {product_data.get('name', 'Unknown')}
-            - Brand: {product_data.get('brand', 'Unknown')}
-            - Category: {product_data.get('category', 'Clothing')}
-            - Materials: {', '.join(materials) if materials else 'Not specified'}
-            - Brand Sustainability Rating: {brand_sustainability.get('sustainability_rating', 'Unknown')}
-            - Brand Certifications: {', '.join(brand_sustainability.get('certifications', []))}
-
-            Please analyze and provide scores (0-100) for:
-
-            1. **Overall Sustainability Score** (0-100)
-            2. **Environmental Impact** (0-100) - Consider material production, dyeing, manufacturing
-            3. **Carbon Footprint** (0-100) - Manufacturing, transportation, packaging
-            4. **Labor Practices** (0-100) - Fair wages, working conditions, ethical sourcing
-            5. **Material Sustainability** (0-100) - Organic, recycled, biodegradable materials
-            6. **Durability & Longevity** (0-100) - Quality, repairability, timeless design
-            7. **End-of-Life** (0-100) - Recyclability, biodegradability, take-back programs
-
-            Also provide:
-            - List of positive certifications found
-            - 3-5 specific improvement suggestions for more sustainable clothing choices
-            - Alternative sustainable brands/products
-
-            Consider these sustainability factors:
-            - Organic or recycled materials (cotton, polyester, etc.)
-            - Fair Trade and ethical labor certifications
-            - Low-impact dyes and manufacturing processes
-            - Circular economy practices (take-back programs, recycling)
-            - Brand transparency and sustainability commitments
-            - Fast fashion vs. slow fashion approach
-
-            Format as JSON with exact keys: overall_score, environmental_impact, carbon_footprint, 
-            labor_practices, material_sustainability, durability, end_of_life, certifications, improvement_suggestions, alternatives
-            """
-
-            headers = {
-                'Authorization': f'Bearer {self.mistral_api_key}',
-                'Content-Type': 'application/json'
-            }
+            prompt = self._CLOTHING_PROMPT_TEMPLATE.substitute(
+                name=product_data.get('name', 'Unknown'),
+                brand=product_data.get('brand', 'Unknown'),
+                category=product_data.get('category', 'Clothing'),
+                materials=', '.join(materials) if materials else 'Not specified',
+                brand_rating=brand_sustainability.get('sustainability_rating', 'Unknown'),
+                brand_certifications=', '.join(brand_sustainability.get('certifications', []))
+            )
 
             payload = {
                 "model": "mistral-large-latest",
@@ -459,12 +730,9 @@ class ProductSustainabilityAnalyzer:
                 "max_tokens": 1500
             }
 
-            response = requests.post(self.mistral_url, headers=headers, json=payload, timeout=30)
+            ai_response = self._request_mistral_content(payload)
             
-            if response.status_code == 200:
-                result = response.json()
-                ai_response = result['choices'][0]['message']['content']
-                
+            if ai_response:
                 # Try to parse JSON from response
                 try:
                     # Extract JSON from response
@@ -496,6 +764,53 @@ class ProductSustainabilityAnalyzer:
             print(f"Error in AI clothing sustainability analysis: {e}")
             return self._create_fallback_clothing_sustainability_score(product_data)
     
+    def _request_mistral_content(self, payload: Dict[str, Any]) -> Optional[str]:
+        """Stream a Mistral chat completion and return its text content
+        
+        Reading stops as soon as the first complete JSON object has arrived, so
+        scoring starts without waiting for the rest of the reply. A malformed
+        event stream returns None (fallback score) rather than a second billed call.
+        """
+        chunks = []
+        tracker = _JsonObjectTracker()
+        
+        try:
+            with self.http.post(self.mistral_url, headers=self._headers,
+                                json=dict(payload, stream=True), timeout=30, stream=True) as response:
+                if response.status_code != 200:
+                    return None
+                
+                lines = response.iter_lines()
+                for line in lines:
+                    # Server-sent events: "data: {...}" lines, terminated by "data: [DONE]"
+                    if not line.startswith(b'data:'):
+                        continue
+                    data = line[5:].strip()
+                    if data == b'[DONE]':
+                        break
+                    
+                    delta = _json_loads(data)['choices'][0].get('delta', {}).get('content') or ''
+                    chunks.append(delta)
+                    if tracker.feed(delta):
+                        break
+                
+                self._drain_event_stream(lines)
+        
+        except (ValueError, KeyError, IndexError, TypeError) as e:
+            print(f"Malformed Mistral stream, using fallback score: {e}")
+            return None
+        
+        return ''.join(chunks)
+    
+    def _drain_event_stream(self, lines) -> None:
+        """Consume a short stream tail so its connection is reused instead of closed"""
+        remaining = _STREAM_DRAIN_LIMIT
+        for line in lines:
+            remaining -= len(line)
+            if remaining < 0:
+                # Too much left to read; closing the response drops the connection
+                return
+    
     def _create_fallback_clothing_sustainability_score(self, product_data: Dict[str, Any]) -> SustainabilityScore:
         """Create fallback sustainability score for clothing based on available data"""
         try:
@@ -507,49 +822,21 @@ class ProductSustainabilityAnalyzer:
             base_score = 50
             
             # Adjust based on materials
-            sustainable_materials = ['organic cotton', 'hemp', 'linen', 'bamboo', 'recycled polyester']
             for material in materials:
-                if any(sustainable in material.lower() for sustainable in sustainable_materials):
+                material_lower = material.lower()
+                if any(sustainable in material_lower for sustainable in _SUSTAINABLE_MATERIALS):
                     base_score += 10
             
             # Adjust based on brand sustainability rating
-            brand_rating = brand_sustainability.get('sustainability_rating', '')
-            if brand_rating == 'A+':
-                base_score += 25
-            elif brand_rating == 'A':
-                base_score += 20
-            elif brand_rating == 'B+':
-                base_score += 15
-            elif brand_rating == 'B':
-                base_score += 10
+            base_score += _BRAND_RATING_BONUS.get(brand_sustainability.get('sustainability_rating', ''), 0)
             
             # Known fast fashion brands (lower scores)
-            fast_fashion_brands = ['shein', 'fashion nova', 'forever 21', 'primark']
-            if any(ff_brand in brand for ff_brand in fast_fashion_brands):
+            if any(ff_brand in brand for ff_brand in _FAST_FASHION_BRANDS):
                 base_score -= 20
             
             score = min(100, max(0, base_score))
             
-            certifications = brand_sustainability.get('certifications', [])
-            
-            suggestions = [
-                "Look for clothing made from organic or recycled materials",
-                "Choose brands with transparent sustainability practices",
-                "Consider the garment's durability and timeless design",
-                "Support brands with fair labor certifications",
-                "Explore clothing rental or second-hand options"
-            ]
-            
-            return SustainabilityScore(
-                overall_score=score,
-                environmental_impact=score - 5,
-                carbon_footprint=score - 10,
-                packaging_score=score + 5,  # Labor practices
-                recyclability=score - 15,
-                ethical_sourcing=score,
-                certifications=certifications,
-                improvement_suggestions=suggestions
-            )
+            return self._build_fallback_clothing_score(score, brand_sustainability.get('certifications', []))
             
         except Exception as e:
             print(f"Error creating fallback clothing score: {e}")
@@ -564,6 +851,60 @@ class ProductSustainabilityAnalyzer:
                 improvement_suggestions=["Consider sustainable clothing options"]
             )
     
+    def _batch_fallback_clothing(self, products: List[Dict[str, Any]]) -> List[SustainabilityScore]:
+        """Score many clothing products at once with the fallback heuristics
+        
+        Vectorized equivalent of _create_fallback_clothing_sustainability_score for
+        offline batch runs (e.g. rebuilding the cache): the per-item branches become
+        NumPy mask operations over columnar arrays.
+        """
+        if not products:
+            return []
+        
+        brand_infos = [product.get('brand_sustainability', {}) for product in products]
+        ratings = np.array([info.get('sustainability_rating', '') for info in brand_infos])
+        brands = [product.get('brand', '').lower() for product in products]
+        
+        # (product x distinct material) occurrence matrix
+        vocabulary: Dict[str, int] = {}
+        rows, cols = [], []
+        for row, product in enumerate(products):
+            for material in product.get('materials', []):
+                rows.append(row)
+                cols.append(vocabulary.setdefault(material.lower(), len(vocabulary)))
+        contains = np.zeros((len(products), len(vocabulary)), dtype=np.int16)
+        np.add.at(contains, (np.array(rows, dtype=np.intp), np.array(cols, dtype=np.intp)), 1)
+        is_sustainable = np.array(
+            [any(sustainable in material for sustainable in _SUSTAINABLE_MATERIALS) for material in vocabulary],
+            dtype=np.int16
+        )
+        fast_fashion = np.array([any(ff_brand in brand for ff_brand in _FAST_FASHION_BRANDS) for brand in brands])
+        
+        base = np.full(len(products), 50, dtype=np.int16)
+        base += 10 * (contains @ is_sustainable)
+        base += np.select([ratings == rating for rating in _BRAND_RATING_BONUS],
+                          list(_BRAND_RATING_BONUS.values()), 0).astype(np.int16)
+        base -= 20 * fast_fashion.astype(np.int16)
+        scores = np.clip(base, 0, 100)
+        
+        return [
+            self._build_fallback_clothing_score(score, info.get('certifications', []))
+            for score, info in zip(scores.tolist(), brand_infos)
+        ]
+    
+    def _build_fallback_clothing_score(self, score: int, certifications: List[str]) -> SustainabilityScore:
+        """Expand a fallback overall clothing score into a full SustainabilityScore"""
+        return SustainabilityScore(
+            overall_score=score,
+            environmental_impact=score - 5,
+            carbon_footprint=score - 10,
+            packaging_score=score + 5,  # Labor practices
+            recyclability=score - 15,
+            ethical_sourcing=score,
+            certifications=certifications,
+            improvement_suggestions=list(_CLOTHING_FALLBACK_SUGGESTIONS)
+        )
+    
     def _create_fallback_sustainability_score(self) -> SustainabilityScore:
         """Create a fallback sustainability score when AI analysis fails"""
         return SustainabilityScore(
@@ -582,101 +923,45 @@ class ProductSustainabilityAnalyzer:
             ]
         )
     
-    def _get_sustainable_alternatives(self, product_data: Dict[str, Any]) -> List[Dict[str, str]]:
-        """Get suggested sustainable alternatives"""
-        alternatives = []
-        category = product_data.get('category', '').lower()
+    def _get_sustainable_alternatives(self, product_data: Dict[str, Any],
+                                      lowered: Optional[Mapping[str, str]] = None) -> Sequence[Mapping[str, str]]:
+        """Get suggested sustainable alternatives (shared read-only constants)"""
+        category = (lowered or self._lowercase_fields(product_data))['category']
         
         # Generic sustainable alternatives based on category
         if 'food' in category or 'drink' in category:
-            alternatives = [
-                {"name": "Organic equivalent", "reason": "Reduced pesticide use"},
-                {"name": "Local/regional brand", "reason": "Lower transportation emissions"},
-                {"name": "Bulk/refillable option", "reason": "Reduced packaging waste"}
-            ]
+            return _FOOD_ALTS
         elif 'cleaning' in category or 'household' in category:
-            alternatives = [
-                {"name": "Eco-friendly cleaning products", "reason": "Biodegradable ingredients"},
-                {"name": "Concentrated formulas", "reason": "Less packaging and transportation"},
-                {"name": "Refillable containers", "reason": "Reduced plastic waste"}
-            ]
+            return _CLEANING_ALTS
         elif 'personal care' in category or 'cosmetic' in category:
-            alternatives = [
-                {"name": "Natural/organic cosmetics", "reason": "Fewer synthetic chemicals"},
-                {"name": "Solid/bar alternatives", "reason": "Plastic-free packaging"},
-                {"name": "Refillable containers", "reason": "Reduced packaging waste"}
-            ]
+            return _PERSONAL_CARE_ALTS
         else:
-            alternatives = [
-                {"name": "Eco-certified alternative", "reason": "Third-party sustainability verification"},
-                {"name": "Minimal packaging option", "reason": "Reduced waste"},
-                {"name": "Local/regional brand", "reason": "Lower carbon footprint"}
-            ]
-        
-        return alternatives
+            return _GENERIC_ALTS
     
-    def _detect_product_category(self, product_data: Dict[str, Any]) -> str:
+    def _detect_product_category(self, product_data: Dict[str, Any],
+                                 lowered: Optional[Mapping[str, str]] = None) -> str:
         """Detect the actual category of a product based on its data"""
         try:
-            name = product_data.get('name', '').lower()
-            category = product_data.get('category', '').lower()
-            description = product_data.get('description', '').lower()
-            ingredients = product_data.get('ingredients', [])
-            materials = product_data.get('materials', [])
-            
-            # Food indicators
-            food_keywords = [
-                'food', 'snack', 'drink', 'beverage', 'meal', 'nutrition', 'organic',
-                'juice', 'water', 'soda', 'cookie', 'bread', 'milk', 'cheese',
-                'meat', 'vegetable', 'fruit', 'cereal', 'pasta', 'rice', 'coffee',
-                'tea', 'chocolate', 'candy', 'sauce', 'soup', 'frozen', 'fresh'
-            ]
-            
-            # Clothing indicators
-            clothing_keywords = [
-                'clothing', 'apparel', 'shirt', 'pants', 'dress', 'jacket', 'sweater',
-                'jeans', 'shorts', 'skirt', 'blouse', 'hoodie', 'coat', 'vest',
-                'underwear', 'socks', 'fashion', 'textile', 'fabric', 'cotton',
-                'polyester', 'wool', 'silk', 'denim', 'leather', 'shoes', 'boots'
-            ]
-            
-            # Count keyword matches
-            food_score = sum(1 for keyword in food_keywords if keyword in name or keyword in category or keyword in description)
-            clothing_score = sum(1 for keyword in clothing_keywords if keyword in name or keyword in category or keyword in description)
-            
-            # Check ingredients/materials
-            if ingredients and len(ingredients) > 0:
-                food_score += 2  # Having ingredients strongly suggests food
-            if materials and len(materials) > 0:
-                clothing_score += 2  # Having materials strongly suggests clothing
-            
-            # Determine category
-            if food_score > clothing_score:
-                return "food"
-            elif clothing_score > food_score:
-                return "clothing"
-            else:
-                return "unknown"
-                
+            lowered = lowered or self._lowercase_fields(product_data)
+            return _detect_category_from_text(
+                lowered['name'],
+                lowered['category'],
+                lowered['description'],
+                bool(product_data.get('ingredients')),
+                bool(product_data.get('materials'))
+            )
         except Exception as e:
             print(f"Error detecting product category: {e}")
             return "unknown"
     
-    def _calculate_category_confidence(self, product_data: Dict[str, Any], expected_category: str) -> float:
-        """Calculate confidence that the product matches the expected category"""
-        try:
-            detected_category = self._detect_product_category(product_data)
-            
-            if detected_category == expected_category:
-                return 0.9  # High confidence when categories match
-            elif detected_category == "unknown":
-                return 0.5  # Medium confidence when unclear
-            else:
-                return 0.2  # Low confidence when categories don't match
-                
-        except Exception as e:
-            print(f"Error calculating category confidence: {e}")
-            return 0.5
+    def _calculate_category_confidence(self, detected_category: str, expected_category: str) -> float:
+        """Calculate confidence that the detected category matches the expected category"""
+        if detected_category == expected_category:
+            return 0.9  # High confidence when categories match
+        elif detected_category == "unknown":
+            return 0.5  # Medium confidence when unclear
+        else:
+            return 0.2  # Low confidence when categories don't match
 
 def create_sustainability_analyzer() -> ProductSustainabilityAnalyzer:
     """Create a new product sustainability analyzer instance"""
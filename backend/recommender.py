@@ -4,13 +4,48 @@ Graph-based recommender for sustainable actions and campus resources
 Uses graph embeddings and collaborative filtering for personalized recommendations
 """
 
+import functools
+import heapq
 import json
+from collections.abc import Mapping
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 from datetime import datetime
 import os
+import types
 
-@dataclass
+# NumPy is optional - the action graph falls back to pairwise Python similarity
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+# Numba JIT-compiles the scoring kernel when installed; otherwise it runs as plain NumPy
+try:
+    from numba import njit
+except ImportError:
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that returns the function unchanged"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+# Planetary boundaries in a fixed order - index into the dense per-action impact vectors
+BOUNDARIES = ("climate", "biosphere", "biogeochemical", "freshwater", "aerosols")
+
+# Cost / budget levels - an action fits a budget when its level is at least the budget's
+COST_LEVELS = {"free": 3, "low": 2, "medium": 1, "high": 0}
+
+def _copy_template(value):
+    """Copy a cached catalog template down to its leaves so callers never share nested containers"""
+    if isinstance(value, Mapping):
+        return {key: _copy_template(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_copy_template(item) for item in value]
+    return value
+
+@dataclass(slots=True, frozen=True)
 class Action:
     id: str
     name: str
@@ -24,7 +59,7 @@ class Action:
     campus_specific: bool  # whether it's campus-specific
     tags: List[str]
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Resource:
     id: str
     name: str
@@ -36,12 +71,41 @@ class Resource:
     related_actions: List[str]  # action IDs this resource supports
     tags: List[str]
 
+@njit(cache=True)
+def _score_kernel(impact_mat, pb_idx, pb_user, difficulty_ids, time_ids, cost_levels, social, campus,
+                  pref_difficulty, easy_difficulty, prefers_hard, pref_time, budget_level,
+                  social_bonus, solo_bonus, campus_bonus):
+    """Vectorized recommendation score for every action (see _calculate_action_score)"""
+    scores = np.zeros(impact_mat.shape[0])
+    
+    # Impact relevance over the user's priority boundaries
+    for k in range(pb_idx.shape[0]):
+        scores += (pb_user[k] / 100.0) * (impact_mat[:, pb_idx[k]] / 100.0) * 10
+    
+    # User context adjustments
+    easy_bonus = 0.0 if prefers_hard else 1.0
+    scores += np.where(difficulty_ids == pref_difficulty, 2.0,
+                       np.where(difficulty_ids == easy_difficulty, easy_bonus, 0.0))
+    scores += np.where(time_ids == pref_time, 1.0, 0.0)
+    scores += np.where(cost_levels >= budget_level, 1.0, 0.0)
+    scores += np.where(social, social_bonus, solo_bonus)
+    scores += np.where(campus, campus_bonus, 0.0)
+    
+    return scores
+
 class EcoBeeRecommender:
     def __init__(self):
         self.actions = self._load_actions()
         self.resources = self._load_resources()
+        self._index_resources()
         self.user_profiles = {}  # user_id -> profile data
+        self._action_tag_sets = {aid: frozenset(a.tags) for aid, a in self.actions.items()}
+        self._tag_counts_by_action = {aid: max(len(a.tags), 1) for aid, a in self.actions.items()}
+        self._index_boundaries()
+        if NUMPY_AVAILABLE:
+            self._encode_actions()
         self.action_graph = self._build_action_graph()
+        self._serialize_catalog()
     
     def _load_actions(self) -> Dict[str, Action]:
         """Load sustainable actions database"""
@@ -286,8 +350,146 @@ class EcoBeeRecommender:
         
         return resources_data
     
+    def _encode_actions(self):
+        """Encode action attributes as NumPy arrays for vectorized similarity/scoring"""
+        self._action_ids = list(self.actions)
+        actions = list(self.actions.values())
+        
+        def ids(values, lookup):
+            return np.array([lookup.setdefault(value, len(lookup)) for value in values], dtype=np.int64)
+        
+        self._category_lookup, self._difficulty_lookup, self._time_lookup = {}, {}, {}
+        self._category_ids = ids((a.category for a in actions), self._category_lookup)
+        self._difficulty_ids = ids((a.difficulty for a in actions), self._difficulty_lookup)
+        self._time_ids = ids((a.time_commitment for a in actions), self._time_lookup)
+        self._cost_levels = np.array([COST_LEVELS.get(a.cost, 0) for a in actions], dtype=np.int64)
+        self._social = np.array([a.social_aspect for a in actions], dtype=bool)
+        self._campus = np.array([a.campus_specific for a in actions], dtype=bool)
+        
+        tag_index = {}
+        for action in actions:
+            for tag in action.tags:
+                tag_index.setdefault(tag, len(tag_index))
+        self._tags_mat = np.zeros((len(actions), len(tag_index)), dtype=np.float64)
+        for row, action in enumerate(actions):
+            for tag in set(action.tags):
+                self._tags_mat[row, tag_index[tag]] = 1.0
+        self._tag_counts = np.array([len(a.tags) for a in actions], dtype=np.float64)
+        
+        # Impact matrix (actions x boundaries) plus a mask of which boundaries an action covers
+        self._impact_mat = np.array([self._impact_vecs[aid] for aid in self._action_ids], dtype=np.float64)
+        self._impact_mask = np.zeros(self._impact_mat.shape, dtype=bool)
+        for row, action in enumerate(actions):
+            for boundary in action.impact_reduction:
+                self._impact_mask[row, self._boundary_idx[boundary]] = True
+    
+    def _index_boundaries(self):
+        """Assign each boundary a fixed index and store dense impact vectors per action"""
+        boundaries = dict.fromkeys(BOUNDARIES)
+        for action in self.actions.values():
+            boundaries.update(dict.fromkeys(action.impact_reduction))
+        self._boundaries = tuple(boundaries)
+        self._boundary_idx = {boundary: i for i, boundary in enumerate(self._boundaries)}
+        
+        self._impact_vecs = {
+            action_id: tuple(float(action.impact_reduction.get(b, 0.0)) for b in self._boundaries)
+            for action_id, action in self.actions.items()
+        }
+    
+    def _index_resources(self):
+        """Map action IDs to the serialized resources that support them"""
+        self._resource_dict_cache = {
+            resource_id: {
+                "resource_id": resource_id,
+                "name": resource.name,
+                "description": resource.description,
+                "type": resource.type,
+                "location": resource.location,
+                "availability": resource.availability,
+                "cost": resource.cost,
+                "tags": resource.tags
+            }
+            for resource_id, resource in self.resources.items()
+        }
+        
+        self._resources_by_action: Dict[str, List[Dict]] = {}
+        for resource_id, resource in self.resources.items():
+            for action_id in dict.fromkeys(resource.related_actions):
+                self._resources_by_action.setdefault(action_id, []).append(
+                    self._resource_dict_cache[resource_id]
+                )
+    
+    def _serialize_catalog(self):
+        """Build the static response dicts for actions and resources once (read-only templates)"""
+        freeze = types.MappingProxyType
+        self._action_dicts = {}
+        self._action_detail_dicts = {}
+        self._actions_by_category: Dict[str, List] = {}
+        
+        for action_id, action in self.actions.items():
+            self._action_dicts[action_id] = freeze({
+                "action_id": action_id,
+                "action": action.name,
+                "description": action.description,
+                "category": action.category,
+                "impact_reduction": action.impact_reduction,
+                "difficulty": action.difficulty,
+                "time_commitment": action.time_commitment,
+                "cost": action.cost,
+                "social_aspect": action.social_aspect,
+                "campus_specific": action.campus_specific,
+                "tags": action.tags
+            })
+            self._action_detail_dicts[action_id] = freeze({
+                "action_id": action_id,
+                "name": action.name,
+                "description": action.description,
+                "category": action.category,
+                "impact_reduction": action.impact_reduction,
+                "difficulty": action.difficulty,
+                "time_commitment": action.time_commitment,
+                "cost": action.cost,
+                "social_aspect": action.social_aspect,
+                "campus_specific": action.campus_specific,
+                "tags": action.tags,
+                "related_resources": self._get_related_resources(action_id),
+                "similar_actions": [
+                    self.actions[aid].name for aid, _ in self.action_graph.get(action_id, [])[:3]
+                ]
+            })
+            category_action = freeze({
+                "action_id": action_id,
+                "name": action.name,
+                "description": action.description,
+                "impact_reduction": action.impact_reduction,
+                "difficulty": action.difficulty,
+                "tags": action.tags
+            })
+            self._actions_by_category.setdefault(action.category.lower(), []).append(category_action)
+        
+        self._all_resource_dicts = tuple(
+            freeze({
+                "resource_id": resource_id,
+                "name": resource.name,
+                "description": resource.description,
+                "type": resource.type,
+                "location": resource.location,
+                "availability": resource.availability,
+                "cost": resource.cost,
+                "related_actions": [
+                    self.actions[aid].name for aid in resource.related_actions 
+                    if aid in self.actions
+                ],
+                "tags": resource.tags
+            })
+            for resource_id, resource in self.resources.items()
+        )
+    
     def _build_action_graph(self) -> Dict:
         """Build graph connections between actions based on shared attributes"""
+        if NUMPY_AVAILABLE:
+            return self._build_action_graph_vectorized()
+        
         graph = {}
         
         for action_id, action in self.actions.items():
@@ -306,6 +508,46 @@ class EcoBeeRecommender:
         
         return graph
     
+    def _build_action_graph_vectorized(self) -> Dict:
+        """Same graph as the pairwise build, computed as one similarity matrix"""
+        similarity = self._similarity_matrix()
+        np.fill_diagonal(similarity, -np.inf)  # No self-connections
+        
+        graph = {}
+        for row, action_id in enumerate(self._action_ids):
+            scores = similarity[row]
+            # Stable descending order keeps ties in action order, like list.sort
+            order = np.argsort(-scores, kind='stable')
+            graph[action_id] = [
+                (self._action_ids[col], float(scores[col]))
+                for col in order if scores[col] > 0.3  # Threshold for connection
+            ]
+        
+        return graph
+    
+    def _similarity_matrix(self) -> "np.ndarray":
+        """Pairwise action similarity, vectorized version of _calculate_action_similarity"""
+        similarity = 0.3 * (self._category_ids[:, None] == self._category_ids[None, :])
+        similarity += 0.2 * (self._difficulty_ids[:, None] == self._difficulty_ids[None, :])
+        similarity += 0.1 * (self._time_ids[:, None] == self._time_ids[None, :])
+        
+        # Tag overlap
+        common_tags = self._tags_mat @ self._tags_mat.T
+        denom = np.maximum(np.maximum(self._tag_counts[:, None], self._tag_counts[None, :]), 1.0)
+        similarity += (common_tags / denom) * 0.3
+        
+        # Impact profile similarity: 1 - mean abs difference over common boundaries
+        common = self._impact_mask[:, None, :] & self._impact_mask[None, :, :]
+        differences = np.abs(self._impact_mat[:, None, :] - self._impact_mat[None, :, :]) / 100.0
+        common_count = common.sum(axis=2)
+        total_difference = np.where(common, differences, 0.0).sum(axis=2)
+        impact_similarity = np.where(
+            common_count > 0, 1.0 - total_difference / np.maximum(common_count, 1), 0.0
+        )
+        similarity += impact_similarity * 0.1
+        
+        return similarity
+    
     def _calculate_action_similarity(self, action1: Action, action2: Action) -> float:
         """Calculate similarity between two actions"""
         similarity = 0.0
@@ -323,8 +565,10 @@ class EcoBeeRecommender:
             similarity += 0.1
         
         # Tag overlap
-        common_tags = set(action1.tags) & set(action2.tags)
-        tag_similarity = len(common_tags) / max(len(action1.tags), len(action2.tags), 1)
+        common_tags = self._action_tag_sets[action1.id] & self._action_tag_sets[action2.id]
+        tag_similarity = len(common_tags) / max(
+            self._tag_counts_by_action[action1.id], self._tag_counts_by_action[action2.id]
+        )
         similarity += tag_similarity * 0.3
         
         # Impact profile similarity
@@ -365,56 +609,80 @@ class EcoBeeRecommender:
             user_context = {}
         
         # Identify priority boundaries (highest impact scores)
-        priority_boundaries = sorted(
-            boundary_scores.items(), 
-            key=lambda x: x[1], 
-            reverse=True
-        )[:3]
+        priority_boundaries = heapq.nlargest(3, boundary_scores.items(), key=lambda x: x[1])
         
-        recommendations = []
+        # Boundaries no action addresses can't contribute to any score
+        priority_idx = [
+            (self._boundary_idx[boundary], user_score)
+            for boundary, user_score in priority_boundaries
+            if boundary in self._boundary_idx
+        ]
         
-        for action_id, action in self.actions.items():
-            score = self._calculate_action_score(
-                action, priority_boundaries, user_context
+        if NUMPY_AVAILABLE:
+            scores = zip(self._action_ids, self._score_actions(priority_idx, user_context).tolist())
+        else:
+            scores = (
+                (action_id, self._calculate_action_score(action, priority_idx, user_context))
+                for action_id, action in self.actions.items()
             )
-            
-            if score > 0:
-                recommendations.append({
-                    "action_id": action_id,
-                    "action": action.name,
-                    "description": action.description,
-                    "category": action.category,
-                    "impact_reduction": action.impact_reduction,
-                    "difficulty": action.difficulty,
-                    "time_commitment": action.time_commitment,
-                    "cost": action.cost,
-                    "social_aspect": action.social_aspect,
-                    "campus_specific": action.campus_specific,
-                    "tags": action.tags,
-                    "recommendation_score": round(score, 2),
-                    "related_resources": self._get_related_resources(action_id)
-                })
-        
-        # Sort by recommendation score and return top recommendations
-        recommendations.sort(key=lambda x: x["recommendation_score"], reverse=True)
-        return recommendations[:limit]
+        
+        # Sort by recommendation score and only copy the top recommendations out of the catalog
+        top = heapq.nlargest(
+            limit,
+            ((action_id, round(score, 2)) for action_id, score in scores if score > 0),
+            key=lambda x: x[1]
+        )
+        
+        recommendations = []
+        for action_id, score in top:
+            recommendation = _copy_template(self._action_dicts[action_id])
+            recommendation["recommendation_score"] = score
+            recommendation["related_resources"] = self._get_related_resources(action_id)
+            recommendations.append(recommendation)
+        
+        return recommendations
+    
+    def _score_actions(
+        self,
+        priority_idx: List[Tuple[int, float]],
+        user_context: Dict
+    ) -> "np.ndarray":
+        """Score every action at once with the numeric kernel (same rules as _calculate_action_score)"""
+        pb_idx = np.array([idx for idx, _ in priority_idx], dtype=np.int64)
+        pb_user = np.array([user_score for _, user_score in priority_idx], dtype=np.float64)
+        
+        difficulty_pref = user_context.get("difficulty_preference", "easy")
+        social_pref = user_context.get("social_preference", True)
+        
+        return _score_kernel(
+            self._impact_mat, pb_idx, pb_user,
+            self._difficulty_ids, self._time_ids, self._cost_levels, self._social, self._campus,
+            self._difficulty_lookup.get(difficulty_pref, -1),
+            self._difficulty_lookup.get("easy", -1),
+            difficulty_pref == "hard",
+            self._time_lookup.get(user_context.get("time_availability", "daily"), -1),
+            COST_LEVELS.get(user_context.get("budget_preference", "free"), 0),
+            0.5 if social_pref == True else 0.0,
+            0.5 if social_pref == False else 0.0,
+            1.0 if user_context.get("is_student", True) else 0.0
+        )
     
     def _calculate_action_score(
         self, 
         action: Action, 
-        priority_boundaries: List[Tuple[str, float]], 
+        priority_idx: List[Tuple[int, float]], 
         user_context: Dict
     ) -> float:
         """Calculate recommendation score for an action"""
         score = 0.0
+        impact_vec = self._impact_vecs[action.id]
         
         # Impact relevance (how well action addresses user's worst boundaries)
-        for boundary, user_score in priority_boundaries:
-            if boundary in action.impact_reduction:
-                # Higher user score = more room for improvement
-                # Higher action impact = better recommendation
-                impact_score = (user_score / 100.0) * (action.impact_reduction[boundary] / 100.0)
-                score += impact_score * 10  # Scale up
+        for idx, user_score in priority_idx:
+            # Higher user score = more room for improvement
+            # Higher action impact = better recommendation
+            impact_score = (user_score / 100.0) * (impact_vec[idx] / 100.0)
+            score += impact_score * 10  # Scale up
         
         # User context adjustments
         difficulty_pref = user_context.get("difficulty_preference", "easy")
@@ -428,10 +696,7 @@ class EcoBeeRecommender:
             score += 1
         
         budget_pref = user_context.get("budget_preference", "free")
-        cost_mapping = {"free": 3, "low": 2, "medium": 1, "high": 0}
-        budget_mapping = {"free": 3, "low": 2, "medium": 1, "high": 0}
-        
-        if cost_mapping.get(action.cost, 0) >= budget_mapping.get(budget_pref, 0):
+        if COST_LEVELS.get(action.cost, 0) >= COST_LEVELS.get(budget_pref, 0):
             score += 1
         
         # Social preference
@@ -447,96 +712,36 @@ class EcoBeeRecommender:
     
     def _get_related_resources(self, action_id: str) -> List[Dict]:
         """Get campus/local resources that support this action"""
-        related = []
-        
-        for resource_id, resource in self.resources.items():
-            if action_id in resource.related_actions:
-                related.append({
-                    "resource_id": resource_id,
-                    "name": resource.name,
-                    "description": resource.description,
-                    "type": resource.type,
-                    "location": resource.location,
-                    "availability": resource.availability,
-                    "cost": resource.cost,
-                    "tags": resource.tags
-                })
-        
-        return related
+        return _copy_template(self._resources_by_action.get(action_id, ()))
     
     def get_action_details(self, action_id: str) -> Optional[Dict]:
         """Get detailed information about a specific action"""
-        if action_id not in self.actions:
+        if action_id not in self._action_detail_dicts:
             return None
         
-        action = self.actions[action_id]
-        
-        return {
-            "action_id": action_id,
-            "name": action.name,
-            "description": action.description,
-            "category": action.category,
-            "impact_reduction": action.impact_reduction,
-            "difficulty": action.difficulty,
-            "time_commitment": action.time_commitment,
-            "cost": action.cost,
-            "social_aspect": action.social_aspect,
-            "campus_specific": action.campus_specific,
-            "tags": action.tags,
-            "related_resources": self._get_related_resources(action_id),
-            "similar_actions": [
-                self.actions[aid].name for aid, _ in self.action_graph.get(action_id, [])[:3]
-            ]
-        }
+        return _copy_template(self._action_detail_dicts[action_id])
     
     def get_all_resources(self) -> List[Dict]:
         """Get all available campus and local resources"""
-        return [
-            {
-                "resource_id": resource_id,
-                "name": resource.name,
-                "description": resource.description,
-                "type": resource.type,
-                "location": resource.location,
-                "availability": resource.availability,
-                "cost": resource.cost,
-                "related_actions": [
-                    self.actions[aid].name for aid in resource.related_actions 
-                    if aid in self.actions
-                ],
-                "tags": resource.tags
-            }
-            for resource_id, resource in self.resources.items()
-        ]
+        return _copy_template(self._all_resource_dicts)
     
     def get_actions_by_category(self, category: str) -> List[Dict]:
         """Get all actions in a specific category"""
-        category_actions = []
-        
-        for action_id, action in self.actions.items():
-            if action.category.lower() == category.lower():
-                category_actions.append({
-                    "action_id": action_id,
-                    "name": action.name,
-                    "description": action.description,
-                    "impact_reduction": action.impact_reduction,
-                    "difficulty": action.difficulty,
-                    "tags": action.tags
-                })
-        
-        return category_actions
+        return _copy_template(self._actions_by_category.get(category.lower(), ()))
 
-# Global recommender instance
-recommender = EcoBeeRecommender()
+# Global recommender instance, built on first use rather than at import time
+@functools.lru_cache(maxsize=1)
+def _get_recommender() -> EcoBeeRecommender:
+    return EcoBeeRecommender()
 
 def get_recommendations(boundary_scores: Dict[str, float], user_context: Dict = None) -> List[Dict]:
     """Main function to get personalized recommendations"""
-    return recommender.get_personalized_recommendations(boundary_scores, user_context)
+    return _get_recommender().get_personalized_recommendations(boundary_scores, user_context)
 
 def get_action_info(action_id: str) -> Dict:
     """Get information about a specific action"""
-    return recommender.get_action_details(action_id)
+    return _get_recommender().get_action_details(action_id)
 
 def get_campus_resources() -> List[Dict]:
     """Get all campus and local resources"""
-    return recommender.get_all_resources()
+    return _get_recommender().get_all_resources()
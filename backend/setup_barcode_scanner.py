@@ -4,9 +4,11 @@ Setup script for EcoBee Intake & Perception with Pixtral Barcode Scanner
 This script helps configure the environment for barcode scanning functionality
 """
 
+import importlib
 import os
 import sys
 import subprocess
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 try:
@@ -17,8 +19,8 @@ except ImportError:
 
 def check_python_version():
     """Check if Python version is compatible"""
-    if sys.version_info < (3, 8):
-        print("❌ Python 3.8 or higher is required")
+    if sys.version_info < (3, 10):
+        print("❌ Python 3.10 or higher is required")
         return False
     print(f"✅ Python {sys.version.split()[0]} is compatible")
     return True
@@ -27,7 +29,11 @@ def install_requirements():
     """Install required packages"""
     print("\n📦 Installing required packages...")
     try:
-        subprocess.check_call([sys.executable, "-m", "pip", "install", "-r", "requirements.txt"])
+        subprocess.check_call([
+            sys.executable, "-m", "pip", "install",
+            "--no-input", "--disable-pip-version-check", "--no-color", "--prefer-binary",
+            "-r", "requirements.txt"
+        ])
         print("✅ All packages installed successfully")
         return True
     except subprocess.CalledProcessError:
@@ -61,6 +67,15 @@ def check_api_key():
         print("   You can get an API key from: https://console.mistral.ai/")
         return False
 
+def _try_import(module_spec):
+    """Import one module, returning (module, package, ok)"""
+    module, package = module_spec
+    try:
+        importlib.import_module(module)
+        return module, package, True
+    except ImportError:
+        return module, package, False
+
 def test_imports():
     """Test if all required modules can be imported"""
     print("\n🧪 Testing imports...")
@@ -72,12 +87,15 @@ def test_imports():
         ('io', 'built-in')
     ]
     
+    # Imports are mostly disk I/O, so overlap them and report in the original order
+    with ThreadPoolExecutor(max_workers=len(required_modules)) as executor:
+        results = list(executor.map(_try_import, required_modules))
+    
     all_good = True
-    for module, package in required_modules:
-        try:
-            __import__(module)
+    for module, package, ok in results:
+        if ok:
             print(f"✅ {module} ({package})")
-        except ImportError:
+        else:
             print(f"❌ {module} ({package}) - missing")
             all_good = False
     
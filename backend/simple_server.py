@@ -5,36 +5,710 @@ This runs without FastAPI/uvicorn dependencies using only Python standard librar
 Includes Pixtral-based barcode scanning capabilities
 """
 
+import bisect
+import dataclasses
+import datetime
+import functools
+import gzip
+import hashlib
 import json
+import logging
+import logging.handlers
+import queue
+import re
+import sqlite3
+import threading
+import time
 import urllib.parse
-from http.server import HTTPServer, BaseHTTPRequestHandler
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 import os
+import tempfile
+import types
+import requests
+from requests.adapters import HTTPAdapter
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+# Numba is optional; without it the numeric helpers run as plain Python
 try:
-    import cgi
+    from numba import njit
 except ImportError:
-    # Fallback for Python 3.13+ when cgi is removed
-    cgi = None
-import tempfile
-from typing import Dict, Any
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that returns the function unchanged"""
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
+
+def _json_default(value: Any) -> Any:
+    """Serialize the values the JSON backends can't encode on their own"""
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    # numpy scalars/arrays (orjson handles these natively)
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+# Pick the fastest JSON library installed: orjson > msgspec > ujson > stdlib json.
+# Every backend is wrapped so _json_dumps returns bytes and _json_loads takes bytes
+try:
+    import orjson
+except ImportError:
+    orjson = None
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+if orjson is not None:
+    JSON_BACKEND = 'orjson'
+    
+    def _json_dumps(data: Any) -> bytes:
+        return orjson.dumps(data, default=_json_default,
+                            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    
+    _json_loads = orjson.loads
+    _JSON_DECODE_ERRORS: Tuple[type, ...] = (ValueError,)
+elif msgspec is not None:
+    JSON_BACKEND = 'msgspec'
+    _msgspec_encoder = msgspec.json.Encoder(enc_hook=_json_default)
+    _msgspec_decoder = msgspec.json.Decoder()
+    
+    def _json_dumps(data: Any) -> bytes:
+        return _msgspec_encoder.encode(data)
+    
+    _json_loads = _msgspec_decoder.decode
+    _JSON_DECODE_ERRORS = (ValueError, msgspec.DecodeError)
+elif ujson is not None:
+    JSON_BACKEND = 'ujson'
+    
+    def _json_dumps(data: Any) -> bytes:
+        return ujson.dumps(data, default=_json_default, ensure_ascii=False,
+                           escape_forward_slashes=False).encode('utf-8')
+    
+    _json_loads = ujson.loads
+    _JSON_DECODE_ERRORS = (ValueError,)
+else:
+    JSON_BACKEND = 'json'
+    
+    def _json_dumps(data: Any) -> bytes:
+        return json.dumps(data, default=_json_default, separators=(',', ':'),
+                          ensure_ascii=False).encode('utf-8')
+    
+    _json_loads = json.loads
+    _JSON_DECODE_ERRORS = (ValueError,)
+
+# Brotli is optional; gzip (stdlib) covers clients that don't advertise "br"
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+@dataclass(slots=True)
+class IntakeForm:
+    """Intake form fields read by normalize_intake_data (None = not answered)"""
+    meal_type: str = 'mixed'
+    meal_origin: Optional[str] = None
+    meal_leftovers: str = 'unknown'
+    outfit_material: Optional[str] = None
+    mobility_mode: Optional[str] = None
+    mobility_distance: str = '1'
+    resource_action: Sequence[str] = ()
+    
+    @classmethod
+    def from_dict(cls, data: dict) -> 'IntakeForm':
+        """Pick the known fields out of a decoded form_responses object
+        
+        Each field's type is checked as it is picked, so a malformed value
+        raises IntakeValidationError instead of failing deep in normalization.
+        """
+        if not isinstance(data, dict):
+            raise IntakeValidationError((), "Input should be a valid dictionary", data)
+        values = {}
+        for name, (is_valid, message) in _INTAKE_FORM_RULES.items():
+            value = data.get(name)
+            # null means "not answered", like a missing key: keep the field default
+            if value is not None:
+                if not is_valid(value):
+                    raise IntakeValidationError((name,), message, value)
+                values[name] = value
+        return cls(**values)
+
+class IntakeValidationError(ValueError):
+    """An intake form field with the wrong type (reported as 422 in FastAPI's detail shape)"""
+    
+    def __init__(self, loc: Tuple[str, ...], msg: str, value: Any):
+        super().__init__(f"{'.'.join(loc) or 'form_responses'}: {msg}")
+        self.loc = loc
+        self.msg = msg
+        self.value = value
+    
+    def detail(self) -> List[Dict[str, Any]]:
+        """Error list in the shape test_request.py reads from a 422 response"""
+        return [{"loc": ["body", *self.loc], "msg": self.msg, "input": self.value}]
+
+def _is_str(value: Any) -> bool:
+    return isinstance(value, str)
+
+def _is_distance(value: Any) -> bool:
+    return isinstance(value, (str, int, float)) and not isinstance(value, bool)
+
+def _is_str_list(value: Any) -> bool:
+    return isinstance(value, (list, tuple)) and all(isinstance(item, str) for item in value)
+
+# Per-field (check, error message); keys follow the IntakeForm field order
+_INTAKE_FORM_RULES = types.MappingProxyType({
+    'meal_type': (_is_str, "Input should be a valid string"),
+    'meal_origin': (_is_str, "Input should be a valid string"),
+    'meal_leftovers': (_is_str, "Input should be a valid string"),
+    'outfit_material': (_is_str, "Input should be a valid string"),
+    'mobility_mode': (_is_str, "Input should be a valid string"),
+    'mobility_distance': (_is_distance, "Input should be a valid string or number"),
+    'resource_action': (_is_str_list, "Input should be a valid list of strings"),
+})
+
+@dataclass(slots=True)
+class IntakeMetadata:
+    """Submission details attached to an intake response"""
+    submission_type: str
+    processed_at: str
+    total_items: int
+    categories: List[str]
+
+@dataclass(slots=True)
+class IntakeResponse:
+    """Intake API response (current schema, ?v=2)"""
+    success: bool
+    normalized_items: List[Dict[str, Any]]  # For deliverable compliance
+    comprehensive_analysis: Dict[str, Any]  # Enhanced analysis
+    eco_score: Dict[str, Any]  # Enhanced scoring
+    metadata: IntakeMetadata
+    reflection_analysis_job: Optional[Dict[str, str]]  # Poll for the AI reflection analysis
+
+@dataclass(slots=True)
+class LegacyIntakeResponse(IntakeResponse):
+    """Intake API response with the frontend aliases and legacy score block"""
+    items: List[Dict[str, Any]]  # For frontend compatibility
+    analysis: Dict[str, Any]  # For frontend compatibility
+    score: Dict[str, Any]  # Legacy compatibility
+
+# Request bodies above this size spill from memory to a temporary file
+_SPOOL_MAX_SIZE = 1024 * 1024
+_READ_CHUNK_SIZE = 64 * 1024
+# JSON/form endpoints read their body into memory in one piece, up to this size
+_MAX_JSON_BODY_SIZE = 2 * 1024 * 1024
+# Responses this large skip the wfile buffer and go out with one sendmsg()
+_SCATTER_WRITE_MIN_SIZE = 64 * 1024
+# Smaller responses aren't worth compressing; fast levels trade a little ratio for CPU
+_COMPRESS_MIN_SIZE = 1024
+_GZIP_LEVEL = 1
+_BROTLI_QUALITY = 4
+
+def accepted_encodings(accept_encoding: str) -> frozenset:
+    """Content codings named in an Accept-Encoding header, minus any refused with q=0"""
+    codings = set()
+    for entry in accept_encoding.lower().split(','):
+        coding, _, params = entry.partition(';')
+        quality = params.replace(' ', '').partition('q=')[2]
+        try:
+            if quality and float(quality) == 0:
+                continue
+        except ValueError:
+            continue
+        codings.add(coding.strip())
+    return frozenset(codings)
+
+_BOUNDARY_PARAM = re.compile(r'boundary=(?:"([^"]+)"|([^;\s]+))', re.IGNORECASE)
+_DISPOSITION_NAME = re.compile(rb'(?:^|;)\s*name="([^"]*)"', re.IGNORECASE | re.MULTILINE)
+
+def parse_multipart_form(body: bytes, content_type: str) -> Dict[str, bytes]:
+    """Parse a multipart/form-data body into {field name: raw value bytes}
+    
+    Works on bytes throughout, so binary uploads (images) are never decoded.
+    The first occurrence of a repeated field wins.
+    """
+    match = _BOUNDARY_PARAM.search(content_type)
+    if not match:
+        return {}
+    delimiter = b'--' + (match.group(1) or match.group(2)).encode('latin-1')
+    
+    # Walk the delimiters by offset so each kept value is sliced out of the
+    # body exactly once (an upload is not copied per part as with split())
+    fields = {}
+    pos = body.find(delimiter)
+    while pos != -1:
+        start = pos + len(delimiter)
+        if body.startswith(b'--', start):
+            break  # Closing delimiter
+        pos = body.find(delimiter, start)
+        end = pos if pos != -1 else len(body)
+        header_end = body.find(b'\r\n\r\n', start, end)
+        if header_end == -1:
+            continue
+        name = _DISPOSITION_NAME.search(body, start, header_end)
+        if not name:
+            continue
+        if body.startswith(b'\r\n', end - 2, end) and end - 2 >= header_end + 4:
+            end -= 2  # CRLF belongs to the next delimiter
+        fields.setdefault(name.group(1).decode('utf-8', 'replace'), body[header_end + 4:end])
+    
+    return fields
+
+# A JSON request body must open with an object or array (after whitespace)
+_JSON_CONTAINER_START = re.compile(rb'\s*[\[{]')
+
+def load_json_body(data: bytes):
+    """Decode a JSON request body, or return None if it is not valid JSON
+    
+    Bodies that cannot start a JSON object/array (empty, form-encoded, ...)
+    are rejected up front without running the decoder.
+    """
+    if not _JSON_CONTAINER_START.match(data):
+        return None
+    try:
+        return _json_loads(data)
+    except _JSON_DECODE_ERRORS:
+        return None
+
+def form_text(fields: Dict[str, bytes], name: str) -> str:
+    """Decode a text field from parse_multipart_form ('' if missing)"""
+    return fields.get(name, b'').decode('utf-8', 'replace').strip()
+
+# Intake normalization lookup tables (read-only, shared by every request)
+_MEAL_SUBCATEGORIES = types.MappingProxyType({
+    'plant-based': 'vegetarian_vegan',
+    'mixed': 'omnivore_balanced', 
+    'meat-heavy': 'meat_focused',
+    'snack': 'processed_snack',
+    'drink': 'beverage'
+})
+
+_CLOTHING_SUBCATEGORIES = types.MappingProxyType({
+    'mostly synthetic': 'synthetic_dominant',
+    'mostly natural': 'natural_dominant', 
+    'mixed': 'blended_materials'
+})
+
+_MOBILITY_SUBCATEGORIES = types.MappingProxyType({
+    'walk': 'active_transport',
+    'bike': 'active_transport',
+    'public_transport': 'mass_transit',
+    'car': 'private_vehicle',
+    'other': 'alternative_transport'
+})
+
+# CO2 kg per km
+_EMISSION_FACTORS = types.MappingProxyType({
+    'walk': 0.0,
+    'bike': 0.0,
+    'public_transport': 0.04,
+    'car': 0.21,
+    'other': 0.15
+})
+
+# Per-meal sustainability metrics
+_MEAL_CARBON_BASE = types.MappingProxyType({
+    'plant-based': 1.5,
+    'mixed': 4.5,
+    'meat-heavy': 8.5,
+    'snack': 2.0,
+    'drink': 1.0
+})
+
+_MEAL_WATER_USAGE = types.MappingProxyType({
+    'plant-based': 500,
+    'mixed': 1500, 
+    'meat-heavy': 3000,
+    'snack': 200,
+    'drink': 100
+})
+
+_MEAL_LAND_USE = types.MappingProxyType({
+    'plant-based': 1.0,
+    'mixed': 3.0,
+    'meat-heavy': 8.0,
+    'snack': 0.5,
+    'drink': 0.2
+})
+
+# Clothing sustainability metrics
+_CLOTHING_PRODUCTION_IMPACT = types.MappingProxyType({
+    'mostly natural': 6.0,
+    'mixed': 7.5,
+    'mostly synthetic': 9.0
+})
+
+_CLOTHING_DURABILITY = types.MappingProxyType({
+    'mostly natural': 8.0,
+    'mixed': 7.0,
+    'mostly synthetic': 6.0
+})
+
+_CLOTHING_RECYCLABILITY = types.MappingProxyType({
+    'mostly natural': 9.0,
+    'mixed': 6.0,
+    'mostly synthetic': 4.0
+})
+
+_MOBILITY_EFFICIENCY = types.MappingProxyType({
+    'walk': 10.0,
+    'bike': 10.0,
+    'public_transport': 8.0,
+    'car': 4.0,
+    'other': 6.0
+})
+
+# Action keyword -> subcategory, highest priority first. The lookahead
+# pattern reports every (even overlapping) keyword in one scan.
+_ACTION_KEYWORDS = (
+    ('water', 'water_conservation'),
+    ('energy', 'energy_conservation'),
+    ('electricity', 'energy_conservation'),
+    ('waste', 'waste_reduction'),
+    ('recycle', 'waste_reduction'),
+    ('transport', 'transport_optimization'),
+    ('car', 'transport_optimization'),
+)
+_ACTION_KEYWORD_PATTERN = re.compile('(?=(' + '|'.join(keyword for keyword, _ in _ACTION_KEYWORDS) + '))')
+_ACTION_KEYWORD_RANK = types.MappingProxyType({keyword: rank for rank, (keyword, _) in enumerate(_ACTION_KEYWORDS)})
+
+# Environmental action metrics
+_HIGH_IMPACT_ACTIONS = frozenset({'switch off unused electronics', 'use public transport'})
+_MEDIUM_IMPACT_ACTIONS = frozenset({'reuse items', 'conserve water'})
+
+_ACTION_IMPACT_SCORES = types.MappingProxyType({
+    'switch off unused electronics': 8.0,
+    'use public transport instead of car': 9.0,
+    'reuse items instead of buying new': 7.0,
+    'conserve water usage': 6.0,
+    'reduce food waste': 8.0,
+    'recycle materials': 6.0
+})
+
+_RESOURCE_SAVINGS = types.MappingProxyType({
+    'switch off unused electronics': {'energy': 0.5, 'cost': 2.0},
+    'use public transport instead of car': {'carbon': 2.1, 'cost': 5.0},
+    'reuse items instead of buying new': {'waste': 0.8, 'cost': 10.0},
+    'conserve water usage': {'water': 50, 'cost': 1.0},
+    'reduce food waste': {'waste': 0.5, 'cost': 3.0},
+    'recycle materials': {'waste': 0.3, 'landfill': 0.2}
+})
+_GENERIC_SAVINGS = types.MappingProxyType({'generic': 1.0})
+
+# Sustainability keywords for the offline reflection scorer. Matched as
+# substrings; the lookahead finds every (even overlapping) occurrence in one scan.
+_SUSTAINABILITY_KEYWORDS = (
+    'future', 'generation', 'environment', 'planet', 'responsible',
+    'protect', 'care', 'preserve', 'reduce', 'recycle', 'green',
+    'climate', 'carbon', 'renewable', 'conscious', 'mindful'
+)
+_SUSTAINABILITY_KEYWORD_PATTERN = re.compile('(?=(' + '|'.join(_SUSTAINABILITY_KEYWORDS) + '))')
+
+@njit(cache=True)
+def _fallback_reflection_score(word_count: int, keyword_count: int) -> int:
+    """Offline reflection score out of 10 from length and keyword presence"""
+    score = 3  # Base score for providing reflection
+    
+    if word_count >= 15:  # Longer responses
+        score += 2
+    elif word_count >= 8:  # Medium responses
+        score += 1
+    
+    score += min(keyword_count, 3)  # Up to 3 bonus points for keywords
+    return min(score, 10)
+
+# Normalized item types, as produced by normalize_intake_data
+_ITEM_TYPES = ('meal', 'transportation', 'clothing', 'environmental_action')
+
+# Scoring lookup tables
+_MEAL_ITEM_SCORES = types.MappingProxyType({
+    'plant-based': 90,
+    'mixed': 70,
+    'meat-heavy': 40,
+    'snack': 60,
+    'drink': 80
+})
+
+_CLOTHING_ITEM_SCORES = types.MappingProxyType({
+    'mostly natural': 85,
+    'mixed': 70,
+    'mostly synthetic': 55
+})
+
+_MEAL_MATERIALS = types.MappingProxyType({
+    "plant-based": ("vegetables", "grains", "legumes", "fruits"),
+    "mixed": ("vegetables", "protein", "grains"),
+    "meat-heavy": ("protein", "animal products"),
+    "snack": ("processed", "packaged"),
+    "drink": ("liquid", "beverage")
+})
+
+_OUTFIT_MATERIALS = types.MappingProxyType({
+    "mostly natural": ("cotton", "wool", "linen", "silk"),
+    "mostly synthetic": ("polyester", "nylon", "acrylic"),
+    "mixed": ("cotton", "polyester", "blend")
+})
+
+# Score bands: labels[bisect_right(thresholds, value)], i.e. each threshold is
+# the inclusive lower bound of the next label
+_GRADE_THRESHOLDS = (50, 60, 70, 80, 90)
+_GRADE_LABELS = ("F", "D", "C", "B", "A", "A+")
+
+_ECO_LEVEL_THRESHOLDS = (40, 60, 80)
+_ECO_LEVELS = ("🌍 Climate Beginner", "🌿 Earth Friend", "🌱 Green Guardian", "🌟 Eco Champion")
+
+# Mobility impact for non-zero emissions (kg CO2)
+_MOBILITY_IMPACT_THRESHOLDS = (0.5, 2.0)
+_MOBILITY_IMPACT_LEVELS = (8.0, 6.0, 3.0)
+
+# Legacy eco score points (meal /30, mobility /25, actions /25, outfit /10)
+_MEAL_CHOICE_SCORES = types.MappingProxyType({
+    "plant-based": 30,
+    "mixed": 20,
+    "meat-heavy": 10,
+    "snack": 15,
+    "drink": 12
+})
+
+_MOBILITY_CHOICE_SCORES = types.MappingProxyType({
+    "walk": 25,
+    "bike": 25,
+    "bus": 18,
+    "train": 18,
+    "car": 8,
+    "other": 12
+})
+
+_DAILY_ACTION_SCORES = types.MappingProxyType({
+    "Used a reusable bottle/cup": 5,
+    "Turned off lights/electronics": 4,
+    "Recycled something": 4,
+    "Chose a plant-based meal": 6,
+    "Used public/shared transport": 6,
+    "None of these": 0
+})
+
+_OUTFIT_CHOICE_SCORES = types.MappingProxyType({
+    "mostly natural": 10,
+    "mixed": 6,
+    "mostly synthetic": 3
+})
+
+# Request-path logging; run_server() attaches a queue-backed handler so the
+# console writes happen on a background thread instead of the request thread
+logger = logging.getLogger("ecobee")
+
+def configure_logging(level: str = None) -> logging.handlers.QueueListener:
+    """Route the ecobee logger through a QueueHandler/QueueListener pair"""
+    log_queue = queue.SimpleQueue()
+    console = logging.StreamHandler()
+    console.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, console)
+    
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    logger.setLevel(level or os.getenv('ECOBEE_LOG_LEVEL', 'INFO').upper())
+    logger.propagate = False
+    listener.start()
+    return listener
 
 # Import barcode scanner
 try:
     from barcode_scanner import create_scanner
     BARCODE_SCANNER_AVAILABLE = True
 except ImportError as e:
-    print(f"⚠️  Barcode scanner not available: {e}")
+    logger.warning("⚠️  Barcode scanner not available: %s", e)
     BARCODE_SCANNER_AVAILABLE = False
 
+@functools.lru_cache(maxsize=1)
+def _mistral_session() -> requests.Session:
+    """Process-wide pooled session so reflection analyses reuse warm TLS connections"""
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(pool_connections=8, pool_maxsize=32))
+    return session
+
+# AI reflection analyses are memoized in memory (LRU) and persisted on disk
+# (SQLite) so repeats and restarts don't re-pay the Mistral round-trip. Only
+# AI results are stored: the offline fallback is cheap to recompute and
+# caching it would stop a failed analysis from ever being retried.
+_REFLECTION_MEMO_MAX = 2048
+_reflection_memo: "OrderedDict[str, dict]" = OrderedDict()
+_reflection_memo_lock = threading.Lock()
+
+_REFLECTION_CACHE_PATH = os.getenv(
+    'ECOBEE_REFLECTION_CACHE', os.path.join(tempfile.gettempdir(), 'ecobee_reflection_cache.sqlite3'))
+_REFLECTION_CACHE_TTL = 30 * 24 * 60 * 60  # 30 days
+_reflection_db = None
+_reflection_db_lock = threading.Lock()
+
+def _open_reflection_cache() -> Optional[sqlite3.Connection]:
+    """Open the on-disk cache on first use (call with _reflection_db_lock held)"""
+    global _reflection_db
+    if _reflection_db is None:
+        try:
+            db = sqlite3.connect(_REFLECTION_CACHE_PATH, check_same_thread=False)
+            db.execute('CREATE TABLE IF NOT EXISTS reflections '
+                       '(key TEXT PRIMARY KEY, created REAL NOT NULL, analysis BLOB NOT NULL)')
+            _reflection_db = db
+        except sqlite3.Error as e:
+            logger.warning("⚠️  Reflection cache disabled (%s): %s", _REFLECTION_CACHE_PATH, e)
+            _reflection_db = False
+    return _reflection_db or None
+
+def _reflection_cache_key(reflection_text: str) -> str:
+    return hashlib.blake2b(reflection_text.encode('utf-8'), digest_size=16).hexdigest()
+
+def _remember_reflection(reflection_text: str, analysis: dict) -> None:
+    with _reflection_memo_lock:
+        _reflection_memo[reflection_text] = analysis
+        _reflection_memo.move_to_end(reflection_text)
+        while len(_reflection_memo) > _REFLECTION_MEMO_MAX:
+            _reflection_memo.popitem(last=False)
+
+def load_cached_reflection(reflection_text: str) -> Optional[dict]:
+    """Previously stored AI analysis for this reflection (memory, then disk)"""
+    with _reflection_memo_lock:
+        analysis = _reflection_memo.get(reflection_text)
+        if analysis is not None:
+            _reflection_memo.move_to_end(reflection_text)
+            return analysis
+    
+    with _reflection_db_lock:
+        db = _open_reflection_cache()
+        if db is None:
+            return None
+        try:
+            row = db.execute('SELECT created, analysis FROM reflections WHERE key = ?',
+                             (_reflection_cache_key(reflection_text),)).fetchone()
+        except sqlite3.Error as e:
+            logger.warning("Reflection cache read failed: %s", e)
+            return None
+    if row is None or time.time() - row[0] > _REFLECTION_CACHE_TTL:
+        return None
+    try:
+        analysis = _json_loads(row[1])
+    except _JSON_DECODE_ERRORS as e:
+        logger.warning("Ignoring corrupt reflection cache entry: %s", e)
+        return None
+    _remember_reflection(reflection_text, analysis)
+    return analysis
+
+def store_cached_reflection(reflection_text: str, analysis: dict) -> None:
+    _remember_reflection(reflection_text, analysis)
+    with _reflection_db_lock:
+        db = _open_reflection_cache()
+        if db is None:
+            return
+        try:
+            with db:
+                db.execute('INSERT OR REPLACE INTO reflections VALUES (?, ?, ?)',
+                           (_reflection_cache_key(reflection_text), time.time(), _json_dumps(analysis)))
+        except sqlite3.Error as e:
+            logger.warning("Reflection cache write failed: %s", e)
+
+# Reflection analyses run in the background so intake responses never wait on
+# Mistral; clients poll GET /api/reflection/<id>. Oldest jobs are forgotten first.
+_REFLECTION_JOBS_MAX = 1024
+# Each job is a paid Mistral call, so intake only starts them when this is enabled
+REFLECTION_JOBS_ENABLED = os.getenv('ECOBEE_REFLECTION_JOBS', '').lower() in ('1', 'true', 'yes')
+_reflection_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="reflection")
+_reflection_jobs: "OrderedDict[str, Future]" = OrderedDict()
+_reflection_jobs_lock = threading.Lock()
+
+def submit_reflection_job(analyze, reflection_text: str) -> Dict[str, str]:
+    """Queue analyze(reflection_text) and return the job handle sent to the client"""
+    job_id = uuid.uuid4().hex
+    future = _reflection_executor.submit(analyze, reflection_text)
+    with _reflection_jobs_lock:
+        _reflection_jobs[job_id] = future
+        while len(_reflection_jobs) > _REFLECTION_JOBS_MAX:
+            _reflection_jobs.popitem(last=False)
+    return {"id": job_id, "status": "pending", "poll_url": f"/api/reflection/{job_id}"}
+
+def get_reflection_job(job_id: str) -> Optional[Future]:
+    with _reflection_jobs_lock:
+        return _reflection_jobs.get(job_id)
+
+_MISTRAL_CHAT_URL = "https://api.mistral.ai/v1/chat/completions"
+
+_REFLECTION_REQUEST_OPTIONS = types.MappingProxyType({
+    "model": "mistral-small-latest",
+    "max_tokens": 400,
+    "temperature": 0.2,  # Lower temperature for more consistent scoring
+    "response_format": {"type": "json_object"}  # Reply is a bare JSON object
+})
+
+# Reflection scoring prompt, split around the user's reflection text
+_REFLECTION_PROMPT_PREFIX = 'Analyze this person\'s reflection on sustainability: "'
+_REFLECTION_PROMPT_SUFFIX = '''"
+
+Score the reflection out of 10 points based on these criteria:
+- Depth of understanding (0-3 points): Shows genuine comprehension of sustainability concepts
+- Personal connection (0-2 points): Demonstrates personal relevance or commitment
+- Specificity (0-2 points): Includes concrete examples or specific aspects
+- Forward-thinking (0-2 points): Mentions future implications, responsibility, or action
+- Clarity (0-1 point): Well-articulated and coherent response
+
+Provide response in JSON format:
+{
+    "insights": "A personalized 1-2 sentence insight about their understanding",
+    "themes": ["list", "of", "key", "sustainability", "themes"],
+    "encouragement": "An encouraging message that builds on their perspective",
+    "reflection_score": 0-10,
+    "scoring_criteria": "Brief explanation of why this score was given",
+    "strengths": ["what", "was", "particularly", "good"],
+    "suggestions": ["gentle", "suggestions", "for", "deeper", "thinking"]
+}
+
+Guidelines:
+- Be encouraging and constructive
+- Score fairly but generously - most sincere attempts should get 5+ points
+- Identify key themes like: future generations, personal responsibility, environmental protection, systems thinking, etc.
+- Keep feedback supportive and educational
+- Even simple responses that show genuine thought should receive reasonable scores
+'''
+
+_scanner = None
+_scanner_lock = threading.Lock()
+
+def get_scanner():
+    """Return the process-wide barcode scanner, creating it on first use"""
+    global _scanner
+    if _scanner is None and BARCODE_SCANNER_AVAILABLE:
+        with _scanner_lock:
+            if _scanner is None:
+                try:
+                    _scanner = create_scanner()
+                except Exception as e:
+                    logger.warning("⚠️  Failed to initialize barcode scanner: %s", e)
+    return _scanner
+
 class IntakeHandler(BaseHTTPRequestHandler):
+    # Keep connections open between the frontend's back-to-back calls; every
+    # response below sends Content-Length so the socket can be reused
+    protocol_version = "HTTP/1.1"
+    # Buffer wfile so the status line, headers and JSON body of a response go
+    # out in one send(); handle_one_request() flushes after each request
+    wbufsize = -1
+    # Small JSON replies go out immediately instead of waiting on Nagle's algorithm
+    disable_nagle_algorithm = True
+    # Reclaim the thread behind an idle keep-alive connection after this many seconds
+    timeout = 30
     
     def __init__(self, *args, **kwargs):
-        # Initialize barcode scanner if available
-        self.scanner = None
-        if BARCODE_SCANNER_AVAILABLE:
-            try:
-                self.scanner = create_scanner()
-            except Exception as e:
-                print(f"⚠️  Failed to initialize barcode scanner: {e}")
+        # The handler is rebuilt per connection; the scanner is shared
+        self.scanner = get_scanner()
         super().__init__(*args, **kwargs)
     
     def do_OPTIONS(self):
@@ -43,11 +717,16 @@ class IntakeHandler(BaseHTTPRequestHandler):
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Methods', 'GET, POST, OPTIONS')
         self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Content-Length', '0')
+        self.send_header('Connection', 'close' if self.close_connection else 'keep-alive')
         self.end_headers()
     
     def do_GET(self):
         """Handle GET requests"""
-        if self.path == '/health':
+        path = self.path.partition('?')[0]
+        if path.startswith('/api/reflection/'):
+            self.handle_reflection_status(path[len('/api/reflection/'):])
+        elif path == '/health':
             self.send_json_response({
                 "status": "ok", 
                 "pixtral_loaded": BARCODE_SCANNER_AVAILABLE and self.scanner is not None,
@@ -58,146 +737,165 @@ class IntakeHandler(BaseHTTPRequestHandler):
     
     def do_POST(self):
         """Handle POST requests"""
-        if self.path == '/api/intake':
+        path, _, self.query_string = self.path.partition('?')
+        # Cleared once a handler consumes the body; see send_json_response
+        self.body_pending = True
+        if path == '/api/intake':
             self.handle_intake()
-        elif self.path == '/api/score':
+        elif path == '/api/score':
             self.handle_score()
-        elif self.path == '/api/scan-barcode':
+        elif path == '/api/scan-barcode':
             self.handle_barcode_scan()
-        elif self.path == '/api/product-sustainability':
+        elif path == '/api/product-sustainability':
             self.handle_product_sustainability()
         else:
+            # The unread request body would corrupt the next keep-alive request
+            self.close_connection = True
             self.send_json_response({"error": "Not found"}, status=404)
     
+    def handle_reflection_status(self, job_id: str):
+        """Report a background reflection analysis started by /api/intake"""
+        future = get_reflection_job(job_id)
+        if future is None:
+            self.send_json_response({"error": "Unknown reflection job", "id": job_id}, status=404)
+        elif not future.done():
+            self.send_json_response({"id": job_id, "status": "pending"})
+        elif future.exception() is not None:
+            logger.error("❌ Reflection job %s failed: %s", job_id, future.exception())
+            self.send_json_response({"id": job_id, "status": "failed"})
+        else:
+            self.send_json_response({
+                "id": job_id,
+                "status": "complete",
+                "reflection_analysis": future.result()
+            })
+    
     def handle_intake(self):
         """Handle intake form submission - Returns normalized item list for Scoring Engine"""
         try:
-            print("📥 Processing intake form submission...")
+            logger.info("📥 Processing intake form submission...")
             
             # Read the request body
-            content_length = int(self.headers.get('Content-Length', 0))
-            post_data = self.rfile.read(content_length)
+            post_data = self.read_small_body()
+            if post_data is None:
+                return
             
             # Parse the form data
             if self.headers.get('Content-Type', '').startswith('multipart/form-data'):
-                # Simple multipart parsing - in a real app you'd use a proper parser
-                data_str = post_data.decode('utf-8')
+                fields = parse_multipart_form(post_data, self.headers.get('Content-Type', ''))
                 
                 # Extract form fields
-                item_type = self.extract_form_field(data_str, 'item_type') or 'meal'
-                form_responses = self.extract_form_field(data_str, 'form_responses') or '{}'
-                food_barcode = self.extract_form_field(data_str, 'food_barcode') or ''
-                clothing_barcode = self.extract_form_field(data_str, 'clothing_barcode') or ''
+                item_type = form_text(fields, 'item_type') or 'meal'
+                form_responses = form_text(fields, 'form_responses') or '{}'
+                food_barcode = form_text(fields, 'food_barcode')
+                clothing_barcode = form_text(fields, 'clothing_barcode')
                 
                 try:
-                    form_data = json.loads(form_responses)
+                    form_data = _json_loads(form_responses)
                 except:
                     form_data = {}
                 
-                print(f"📊 Extracted form data: {form_data}")
-                
-                # Normalize the data into structured items for scoring
-                normalized_items = self.normalize_intake_data(form_data, food_barcode, clothing_barcode)
+                logger.debug("📊 Extracted form data: %s", form_data)
                 
-                # Generate analysis and scoring
-                analysis = self.generate_comprehensive_analysis(normalized_items, form_data)
-                eco_score = self.calculate_comprehensive_eco_score(normalized_items, form_data)
+                response = self.build_intake_response(form_data, food_barcode, clothing_barcode, "intake_form")
                 
-                response = {
-                    "success": True,
-                    "normalized_items": normalized_items,  # For deliverable compliance
-                    "items": normalized_items,  # For frontend compatibility
-                    "comprehensive_analysis": analysis,  # Enhanced analysis
-                    "analysis": analysis,  # For frontend compatibility
-                    "eco_score": eco_score,  # Enhanced scoring
-                    "score": {  # Legacy compatibility
-                        "total": eco_score.get("overall_score", 0),
-                        "level": eco_score.get("grade", "N/A"),
-                        "breakdown": {
-                            "food_choices": eco_score.get("category_scores", {}).get("meal", 0),
-                            "transportation": eco_score.get("category_scores", {}).get("transportation", 0),
-                            "daily_actions": eco_score.get("category_scores", {}).get("environmental_actions", 0),
-                            "clothing": eco_score.get("category_scores", {}).get("clothing", 0),
-                            "reflection": 0  # Not calculated in new system
-                        }
-                    },
-                    "metadata": {
-                        "submission_type": "intake_form",
-                        "processed_at": self.get_timestamp(),
-                        "total_items": len(normalized_items),
-                        "categories": list(set([item["category"] for item in normalized_items]))
-                    }
-                }
-                
-                print(f"✅ Normalized {len(normalized_items)} items for scoring engine")
+                logger.info("✅ Normalized %d items for scoring engine", response.metadata.total_items)
                 self.send_json_response(response)
                 
             else:
                 # Handle JSON payload
-                try:
-                    json_data = json.loads(post_data.decode('utf-8'))
-                    form_data = json_data.get('form_responses', json_data)
-                    food_barcode = json_data.get('food_barcode', '')
-                    clothing_barcode = json_data.get('clothing_barcode', '')
-                    
-                    # Normalize the JSON data
-                    normalized_items = self.normalize_intake_data(form_data, food_barcode, clothing_barcode)
-                    analysis = self.generate_comprehensive_analysis(normalized_items, form_data)
-                    eco_score = self.calculate_comprehensive_eco_score(normalized_items, form_data)
-                    
-                    response = {
-                        "success": True,
-                        "normalized_items": normalized_items,  # For deliverable compliance
-                        "items": normalized_items,  # For frontend compatibility
-                        "comprehensive_analysis": analysis,  # Enhanced analysis
-                        "analysis": analysis,  # For frontend compatibility
-                        "eco_score": eco_score,  # Enhanced scoring
-                        "score": {  # Legacy compatibility
-                            "total": eco_score.get("overall_score", 0),
-                            "level": eco_score.get("grade", "N/A"),
-                            "breakdown": {
-                                "food_choices": eco_score.get("category_scores", {}).get("meal", 0),
-                                "transportation": eco_score.get("category_scores", {}).get("transportation", 0),
-                                "daily_actions": eco_score.get("category_scores", {}).get("environmental_actions", 0),
-                                "clothing": eco_score.get("category_scores", {}).get("clothing", 0),
-                                "reflection": 0  # Not calculated in new system
-                            }
-                        },
-                        "metadata": {
-                            "submission_type": "json_api",
-                            "processed_at": self.get_timestamp(),
-                            "total_items": len(normalized_items),
-                            "categories": list(set([item["category"] for item in normalized_items]))
-                        }
-                    }
-                    
-                    self.send_json_response(response)
-                    
-                except json.JSONDecodeError:
+                json_data = load_json_body(post_data)
+                if json_data is None:
                     self.send_json_response({"error": "Invalid JSON data"}, status=400)
+                    return
+                if not isinstance(json_data, dict):
+                    raise IntakeValidationError((), "Input should be a valid dictionary", json_data)
+                
+                form_data = json_data.get('form_responses', json_data)
+                food_barcode = json_data.get('food_barcode', '')
+                clothing_barcode = json_data.get('clothing_barcode', '')
+                
+                response = self.build_intake_response(form_data, food_barcode, clothing_barcode, "json_api")
+                self.send_json_response(response)
                     
+        except IntakeValidationError as e:
+            logger.info("⚠️ Rejected intake form: %s", e)
+            self.send_json_response({"detail": e.detail()}, status=422)
         except Exception as e:
-            print(f"❌ Error processing intake: {str(e)}")
+            logger.error("❌ Error processing intake: %s", e)
             self.send_json_response({"error": f"Server error: {str(e)}"}, status=500)
     
+    def build_intake_response(self, form_data: dict, food_barcode: str, clothing_barcode: str,
+                              submission_type: str) -> IntakeResponse:
+        """Normalize, analyze and score an intake submission into the API response
+        
+        Requests with ?v=2 get only the current schema; otherwise the frontend
+        aliases (items/analysis) and the legacy score block are included too.
+        """
+        # Normalize the data into structured items for scoring
+        normalized_items = self.normalize_intake_data(form_data, food_barcode, clothing_barcode)
+        
+        # Generate analysis and scoring
+        analysis, eco_score = self.analyze_and_score(normalized_items, form_data)
+        
+        # The AI reflection analysis is slow (and billed); when enabled, hand back
+        # a job to poll instead of waiting
+        reflection = form_data.get('reflection')
+        reflection_job = None
+        if REFLECTION_JOBS_ENABLED and isinstance(reflection, str) and reflection.strip():
+            reflection_job = submit_reflection_job(self.analyze_reflection, reflection)
+        
+        metadata = IntakeMetadata(
+            submission_type=submission_type,
+            processed_at=self.get_timestamp(),
+            total_items=len(normalized_items),
+            categories=list({item["category"] for item in normalized_items})
+        )
+        
+        if self.get_api_version() >= 2:
+            return IntakeResponse(True, normalized_items, analysis, eco_score, metadata, reflection_job)
+        
+        category_scores = eco_score.get("category_scores", {})
+        return LegacyIntakeResponse(
+            True, normalized_items, analysis, eco_score, metadata, reflection_job,
+            items=normalized_items,
+            analysis=analysis,
+            score={
+                "total": eco_score.get("overall_score", 0),
+                "level": eco_score.get("grade", "N/A"),
+                "breakdown": {
+                    "food_choices": category_scores.get("meal", 0),
+                    "transportation": category_scores.get("transportation", 0),
+                    "daily_actions": category_scores.get("environmental_actions", 0),
+                    "clothing": category_scores.get("clothing", 0),
+                    "reflection": 0  # Not calculated in new system
+                }
+            }
+        )
+    
+    def get_api_version(self) -> int:
+        """Response schema version from the ?v= query parameter (defaults to 1)"""
+        values = urllib.parse.parse_qs(getattr(self, 'query_string', '')).get('v')
+        try:
+            return int(values[0]) if values else 1
+        except ValueError:
+            return 1
+    
     def handle_score(self):
         """Handle score calculation"""
         try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            post_data = self.rfile.read(content_length)
-            data = json.loads(post_data.decode('utf-8'))
+            post_data = self.read_small_body()
+            if post_data is None:
+                return
+            data = _json_loads(post_data)
             
             # Mock scoring - calculate based on number of items and sustainability
             items = data.get('items', [])
             score = 50  # Base score
             
-            for item in items:
-                if 'plant' in item.get('category', '').lower():
-                    score += 20
-                elif 'sustainable' in item.get('category', '').lower():
-                    score += 15
-                else:
-                    score += 5
+            # One lowercase copy of each category, scored in a single pass
+            for category in (item.get('category', '').lower() for item in items):
+                score += 20 if 'plant' in category else 15 if 'sustainable' in category else 5
             
             response = {
                 "total_score": min(score, 100),
@@ -229,56 +927,31 @@ class IntakeHandler(BaseHTTPRequestHandler):
                 }, status=503)
                 return
             
-            content_length = int(self.headers.get('Content-Length', 0))
-            post_data = self.rfile.read(content_length)
-            
             # Default product type
             product_type = "food"
             
-            # Check if it's multipart form data (image upload)
-            if self.headers.get('Content-Type', '').startswith('multipart/form-data'):
-                if cgi is None:
-                    self.send_json_response({
-                        "success": False,
-                        "error": "Multipart form data parsing not available in this Python version",
-                        "barcode": None,
-                        "product_info": None
-                    }, status=500)
-                    return
-                
-                # Parse multipart form data
-                boundary = self.headers.get('Content-Type').split('boundary=')[1]
-                env = os.environ.copy()
-                env['REQUEST_METHOD'] = 'POST'
-                env['CONTENT_TYPE'] = self.headers.get('Content-Type')
-                env['CONTENT_LENGTH'] = str(content_length)
-                
-                # Create a temporary file for the form data
-                with tempfile.NamedTemporaryFile() as tmp:
-                    tmp.write(post_data)
-                    tmp.seek(0)
-                    
-                    # Parse form data
-                    form = cgi.FieldStorage(
-                        fp=tmp,
-                        environ=env,
-                        keep_blank_values=True
-                    )
+            body = self.read_body()
+            if body is None:
+                return
+            
+            with body:
+                # Check if it's multipart form data (image upload)
+                content_type = self.headers.get('Content-Type', '')
+                if content_type.startswith('multipart/form-data'):
+                    # Parse multipart form data in one pass over the body bytes
+                    fields = parse_multipart_form(body.read(), content_type)
                     
                     # Extract product_type if present
-                    if 'product_type' in form:
-                        product_type = form['product_type'].value
+                    if 'product_type' in fields:
+                        product_type = form_text(fields, 'product_type')
                     
                     # Look for image field
-                    if 'image' in form:
-                        image_field = form['image']
-                        if image_field.file:
-                            image_data = image_field.file.read()
-                            
-                            # Scan barcode using Pixtral
-                            result = self.scanner.scan_barcode_from_image(image_data, product_type)
-                            self.send_json_response(result)
-                            return
+                    image_data = fields.get('image')
+                    if image_data:
+                        # Scan barcode using Pixtral
+                        result = self.scanner.scan_barcode_from_image(image_data, product_type)
+                        self.send_json_response(result)
+                        return
                     
                     # If no image found in form
                     self.send_json_response({
@@ -288,10 +961,17 @@ class IntakeHandler(BaseHTTPRequestHandler):
                         "product_info": None
                     }, status=400)
                     
-            else:
-                # Handle JSON payload with base64 image
-                try:
-                    json_data = json.loads(post_data.decode('utf-8'))
+                else:
+                    # Handle JSON payload with base64 image
+                    json_data = load_json_body(body.read())
+                    if json_data is None:
+                        self.send_json_response({
+                            "success": False,
+                            "error": "Invalid JSON data",
+                            "barcode": None,
+                            "product_info": None
+                        }, status=400)
+                        return
                     
                     # Extract product_type if present
                     if 'product_type' in json_data:
@@ -300,9 +980,9 @@ class IntakeHandler(BaseHTTPRequestHandler):
                     if 'image_base64' in json_data:
                         base64_image = json_data['image_base64']
                         
-                        # Remove data URL prefix if present
+                        # Remove data URL prefix if present (one slice, no split list)
                         if base64_image.startswith('data:image'):
-                            base64_image = base64_image.split(',')[1]
+                            base64_image = base64_image[base64_image.find(',') + 1:]
                         
                         # Scan barcode using Pixtral
                         result = self.scanner.scan_barcode_from_base64(base64_image, product_type)
@@ -314,14 +994,6 @@ class IntakeHandler(BaseHTTPRequestHandler):
                             "barcode": None,
                             "product_info": None
                         }, status=400)
-                        
-                except json.JSONDecodeError:
-                    self.send_json_response({
-                        "success": False,
-                        "error": "Invalid JSON data",
-                        "barcode": None,
-                        "product_info": None
-                    }, status=400)
                     
         except Exception as e:
             self.send_json_response({
@@ -334,58 +1006,61 @@ class IntakeHandler(BaseHTTPRequestHandler):
     def handle_product_sustainability(self):
         """Handle product sustainability lookup by barcode"""
         try:
-            content_length = int(self.headers.get('Content-Length', 0))
-            post_data = self.rfile.read(content_length)
+            post_data = self.read_small_body()
+            if post_data is None:
+                return
             
-            try:
-                json_data = json.loads(post_data.decode('utf-8'))
-                barcode = json_data.get('barcode', '')
-                product_type = json_data.get('product_type', 'food')  # Default to food if not specified
-                
-                if not barcode:
-                    self.send_json_response({
-                        "success": False,
-                        "error": "No barcode provided",
-                        "sustainability": None
-                    }, status=400)
-                    return
-                
-                # Check if sustainability analyzer is available
-                if not BARCODE_SCANNER_AVAILABLE or not self.scanner or not self.scanner.sustainability_analyzer:
-                    self.send_json_response({
-                        "success": False,
-                        "error": "Product sustainability analysis not available. Please check dependencies and API keys.",
-                        "sustainability": None
-                    }, status=503)
-                    return
-                
-                # Get sustainability information
-                print(f"🔍 Looking up sustainability info for {product_type} barcode: {barcode}")
-                sustainability_info = self.scanner._get_product_sustainability(barcode, product_type)
-                print(f"📊 Sustainability result: {sustainability_info is not None}")
-                
-                if sustainability_info:
-                    print(f"✅ Found {product_type} product: {sustainability_info.get('name', 'Unknown')}")
-                    self.send_json_response({
-                        "success": True,
-                        "barcode": barcode,
-                        "product_type": product_type,
-                        "sustainability": sustainability_info
-                    })
-                else:
-                    print(f"❌ No sustainability info found for {product_type} barcode: {barcode}")
-                    self.send_json_response({
-                        "success": False,
-                        "error": f"Could not find sustainability information for this {product_type} product",
-                        "sustainability": None
-                    }, status=404)
-                    
-            except json.JSONDecodeError:
+            json_data = load_json_body(post_data)
+            if json_data is None:
                 self.send_json_response({
                     "success": False,
                     "error": "Invalid JSON data",
                     "sustainability": None
                 }, status=400)
+                return
+            
+            barcode = json_data.get('barcode', '')
+            product_type = json_data.get('product_type', 'food')  # Default to food if not specified
+            
+            if not barcode:
+                self.send_json_response({
+                    "success": False,
+                    "error": "No barcode provided",
+                    "sustainability": None
+                }, status=400)
+                return
+            
+            # Check if sustainability analyzer is available
+            if not BARCODE_SCANNER_AVAILABLE or not self.scanner or not self.scanner.sustainability_analyzer:
+                self.send_json_response({
+                    "success": False,
+                    "error": "Product sustainability analysis not available. Please check dependencies and API keys.",
+                    "sustainability": None
+                }, status=503)
+                return
+            
+            # Get sustainability information
+            logger.info("🔍 Looking up sustainability info for %s barcode: %s", product_type, barcode)
+            # "Cache-Control: no-cache" forces a fresh upstream lookup (debugging)
+            use_cache = 'no-cache' not in self.headers.get('Cache-Control', '')
+            sustainability_info = self.scanner._get_product_sustainability(barcode, product_type, use_cache)
+            logger.debug("📊 Sustainability result: %s", sustainability_info is not None)
+            
+            if sustainability_info:
+                logger.info("✅ Found %s product: %s", product_type, sustainability_info.get('name', 'Unknown'))
+                self.send_json_response({
+                    "success": True,
+                    "barcode": barcode,
+                    "product_type": product_type,
+                    "sustainability": sustainability_info
+                })
+            else:
+                logger.info("❌ No sustainability info found for %s barcode: %s", product_type, barcode)
+                self.send_json_response({
+                    "success": False,
+                    "error": f"Could not find sustainability information for this {product_type} product",
+                    "sustainability": None
+                }, status=404)
                 
         except Exception as e:
             self.send_json_response({
@@ -394,53 +1069,79 @@ class IntakeHandler(BaseHTTPRequestHandler):
                 "sustainability": None
             }, status=500)
     
-    def extract_form_field(self, data_str: str, field_name: str) -> str:
-        """Extract a field from multipart form data (very basic)"""
-        try:
-            # Look for pattern: name="field_name"
-            start_pattern = f'name="{field_name}"'
-            start_idx = data_str.find(start_pattern)
-            if start_idx == -1:
-                return ""
-            
-            # Find the start of the value (after the double newline)
-            value_start = data_str.find('\r\n\r\n', start_idx)
-            if value_start == -1:
-                return ""
-            value_start += 4
-            
-            # Find the end of the value (next boundary)
-            value_end = data_str.find('\r\n--', value_start)
-            if value_end == -1:
-                value_end = len(data_str)
-            
-            return data_str[value_start:value_end].strip()
-        except:
-            return ""
+    def read_small_body(self) -> Optional[bytes]:
+        """Read a JSON/form request body as one bytes object for orjson to parse in place
+        
+        Oversized bodies are refused with 413 (and None returned) before any
+        of them is buffered.
+        """
+        content_length = self.content_length()
+        if content_length is None:
+            return None
+        if content_length > _MAX_JSON_BODY_SIZE:
+            self.send_json_response({"error": "Request body too large"}, status=413)
+            return None
+        self.body_pending = False
+        return self.rfile.read(content_length)
+    
+    def content_length(self) -> Optional[int]:
+        """Parse Content-Length; a missing header means 0, a malformed one gets a 400 (None returned)"""
+        value = self.headers.get('Content-Length', '0').strip()
+        if not (value.isascii() and value.isdigit()):
+            self.send_json_response({"error": "Invalid Content-Length header"}, status=400)
+            return None
+        return int(value)
+    
+    def read_body(self) -> Optional[tempfile.SpooledTemporaryFile]:
+        """Copy the request body into a spooled temp file (memory up to 1 MB, then disk)
+        
+        Returns None after answering 400 when Content-Length is malformed.
+        """
+        remaining = self.content_length()
+        if remaining is None:
+            return None
+        self.body_pending = False
+        spool = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_SIZE)
+        while remaining > 0:
+            chunk = self.rfile.read(min(remaining, _READ_CHUNK_SIZE))
+            if not chunk:
+                break
+            spool.write(chunk)
+            remaining -= len(chunk)
+        spool.seek(0)
+        return spool
     
     def normalize_intake_data(self, form_data: dict, food_barcode: str = "", clothing_barcode: str = "") -> list:
         """Normalize intake form data into structured items for the Scoring Engine"""
         normalized_items = []
         
+        # Read each form field once, then work with attributes
+        form = IntakeForm.from_dict(form_data)
+        meal_type = form.meal_type
+        meal_origin = form.meal_origin or ''
+        meal_leftovers = form.meal_leftovers
+        outfit = form.outfit_material
+        mobility_mode = form.mobility_mode
+        
         # 1. MEAL ITEM - Primary food consumption
         meal_item = {
             "id": "meal_001",
             "type": "meal",
-            "category": form_data.get('meal_type', 'mixed'),
-            "subcategory": self.get_meal_subcategory(form_data.get('meal_type', 'mixed')),
+            "category": meal_type,
+            "subcategory": self.get_meal_subcategory(meal_type),
             "attributes": {
-                "origin": form_data.get('meal_origin', 'unknown'),
-                "leftovers": form_data.get('meal_leftovers', 'unknown'),
+                "origin": 'unknown' if form.meal_origin is None else form.meal_origin,
+                "leftovers": meal_leftovers,
                 "barcode": food_barcode if food_barcode else None,
-                "source_local": form_data.get('meal_origin') == 'Locally sourced',
-                "source_homegrown": form_data.get('meal_origin') == 'Home-grown',
-                "waste_level": self.categorize_waste_level(form_data.get('meal_leftovers', ''))
+                "source_local": meal_origin == 'Locally sourced',
+                "source_homegrown": meal_origin == 'Home-grown',
+                "waste_level": self.categorize_waste_level(meal_leftovers)
             },
             "sustainability_metrics": {
-                "carbon_footprint": self.calculate_meal_carbon_footprint(form_data),
-                "water_usage": self.calculate_meal_water_usage(form_data),
-                "land_use": self.calculate_meal_land_use(form_data),
-                "packaging_score": self.calculate_packaging_score(form_data)
+                "carbon_footprint": self.meal_carbon_footprint(meal_type, meal_origin),
+                "water_usage": self.meal_water_usage(meal_type),
+                "land_use": self.meal_land_use(meal_type),
+                "packaging_score": self.packaging_score(meal_origin)
             },
             "confidence": 0.95,
             "data_quality": "high"
@@ -448,22 +1149,23 @@ class IntakeHandler(BaseHTTPRequestHandler):
         normalized_items.append(meal_item)
         
         # 2. CLOTHING ITEM - Outfit choices
-        if form_data.get('outfit_material') or clothing_barcode:
+        if outfit or clothing_barcode:
+            material = 'mixed' if outfit is None else outfit
             clothing_item = {
                 "id": "clothing_001", 
                 "type": "clothing",
-                "category": form_data.get('outfit_material', 'mixed'),
-                "subcategory": self.get_clothing_subcategory(form_data.get('outfit_material')),
+                "category": material,
+                "subcategory": self.get_clothing_subcategory(outfit),
                 "attributes": {
-                    "material_type": form_data.get('outfit_material'),
+                    "material_type": outfit,
                     "barcode": clothing_barcode if clothing_barcode else None,
-                    "synthetic_content": self.get_synthetic_content(form_data.get('outfit_material')),
-                    "natural_content": self.get_natural_content(form_data.get('outfit_material'))
+                    "synthetic_content": self.get_synthetic_content(outfit),
+                    "natural_content": self.get_natural_content(outfit)
                 },
                 "sustainability_metrics": {
-                    "production_impact": self.calculate_clothing_production_impact(form_data),
-                    "durability_score": self.calculate_clothing_durability(form_data),
-                    "recyclability": self.calculate_clothing_recyclability(form_data)
+                    "production_impact": self.clothing_production_impact(material),
+                    "durability_score": self.clothing_durability(material),
+                    "recyclability": self.clothing_recyclability(material)
                 },
                 "confidence": 0.8,
                 "data_quality": "medium"
@@ -471,22 +1173,26 @@ class IntakeHandler(BaseHTTPRequestHandler):
             normalized_items.append(clothing_item)
         
         # 3. MOBILITY ITEM - Transportation choices
-        if form_data.get('mobility_mode'):
+        if mobility_mode:
+            distance = form.mobility_distance
+            distance_numeric = self.parse_distance(distance)
+            emission_factor = self.get_emission_factor(mobility_mode)
+            carbon_emissions = self.mobility_emissions(distance_numeric, emission_factor)
             mobility_item = {
                 "id": "mobility_001",
                 "type": "transportation", 
-                "category": form_data.get('mobility_mode', 'unknown'),
-                "subcategory": self.get_mobility_subcategory(form_data.get('mobility_mode')),
+                "category": mobility_mode,
+                "subcategory": self.get_mobility_subcategory(mobility_mode),
                 "attributes": {
-                    "mode": form_data.get('mobility_mode'),
-                    "distance": form_data.get('mobility_distance', '1'),
-                    "distance_numeric": self.parse_distance(form_data.get('mobility_distance', '1')),
-                    "emission_factor": self.get_emission_factor(form_data.get('mobility_mode'))
+                    "mode": mobility_mode,
+                    "distance": distance,
+                    "distance_numeric": distance_numeric,
+                    "emission_factor": emission_factor
                 },
                 "sustainability_metrics": {
-                    "carbon_emissions": self.calculate_mobility_emissions(form_data),
-                    "energy_efficiency": self.calculate_mobility_efficiency(form_data),
-                    "environmental_impact": self.calculate_mobility_impact(form_data)
+                    "carbon_emissions": carbon_emissions,
+                    "energy_efficiency": self.mobility_efficiency(mobility_mode),
+                    "environmental_impact": self.mobility_impact(carbon_emissions)
                 },
                 "confidence": 0.9,
                 "data_quality": "high"
@@ -494,9 +1200,8 @@ class IntakeHandler(BaseHTTPRequestHandler):
             normalized_items.append(mobility_item)
         
         # 4. RESOURCE ACTION ITEMS - Environmental actions taken
-        resource_actions = form_data.get('resource_action', [])
-        if resource_actions:
-            for i, action in enumerate(resource_actions):
+        if form.resource_action:
+            for i, action in enumerate(form.resource_action):
                 action_item = {
                     "id": f"action_{i+1:03d}",
                     "type": "environmental_action",
@@ -519,35 +1224,24 @@ class IntakeHandler(BaseHTTPRequestHandler):
         return normalized_items
     
     # Helper methods for normalization
-    def get_meal_subcategory(self, meal_type: str) -> str:
-        mapping = {
-            'plant-based': 'vegetarian_vegan',
-            'mixed': 'omnivore_balanced', 
-            'meat-heavy': 'meat_focused',
-            'snack': 'processed_snack',
-            'drink': 'beverage'
-        }
-        return mapping.get(meal_type, 'other')
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def get_meal_subcategory(meal_type: str) -> str:
+        return _MEAL_SUBCATEGORIES.get(meal_type, 'other')
     
-    def get_clothing_subcategory(self, material: str) -> str:
-        mapping = {
-            'mostly synthetic': 'synthetic_dominant',
-            'mostly natural': 'natural_dominant', 
-            'mixed': 'blended_materials'
-        }
-        return mapping.get(material, 'unknown')
-    
-    def get_mobility_subcategory(self, mode: str) -> str:
-        mapping = {
-            'walk': 'active_transport',
-            'bike': 'active_transport',
-            'public_transport': 'mass_transit',
-            'car': 'private_vehicle',
-            'other': 'alternative_transport'
-        }
-        return mapping.get(mode, 'unknown')
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def get_clothing_subcategory(material: str) -> str:
+        return _CLOTHING_SUBCATEGORIES.get(material, 'unknown')
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def get_mobility_subcategory(mode: str) -> str:
+        return _MOBILITY_SUBCATEGORIES.get(mode, 'unknown')
     
-    def categorize_waste_level(self, leftovers: str) -> str:
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def categorize_waste_level(leftovers: str) -> str:
         if 'None left' in leftovers:
             return 'no_waste'
         elif 'will eat later' in leftovers:
@@ -557,20 +1251,15 @@ class IntakeHandler(BaseHTTPRequestHandler):
         else:
             return 'unknown'
     
-    def categorize_action(self, action: str) -> str:
-        action_lower = action.lower()
-        if 'water' in action_lower:
-            return 'water_conservation'
-        elif 'energy' in action_lower or 'electricity' in action_lower:
-            return 'energy_conservation'
-        elif 'waste' in action_lower or 'recycle' in action_lower:
-            return 'waste_reduction'
-        elif 'transport' in action_lower or 'car' in action_lower:
-            return 'transport_optimization'
-        else:
-            return 'general_conservation'
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def categorize_action(action: str) -> str:
+        ranks = [_ACTION_KEYWORD_RANK[keyword] for keyword in _ACTION_KEYWORD_PATTERN.findall(action.lower())]
+        return _ACTION_KEYWORDS[min(ranks)][1] if ranks else 'general_conservation'
     
-    def get_synthetic_content(self, material: str) -> float:
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def get_synthetic_content(material: str) -> float:
         if 'mostly synthetic' in material:
             return 0.8
         elif 'mixed' in material:
@@ -578,8 +1267,10 @@ class IntakeHandler(BaseHTTPRequestHandler):
         else:
             return 0.2
     
-    def get_natural_content(self, material: str) -> float:
-        return 1.0 - self.get_synthetic_content(material)
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def get_natural_content(material: str) -> float:
+        return 1.0 - IntakeHandler.get_synthetic_content(material)
     
     def parse_distance(self, distance_str: str) -> float:
         try:
@@ -587,43 +1278,33 @@ class IntakeHandler(BaseHTTPRequestHandler):
         except:
             return 1.0
     
-    def get_emission_factor(self, mode: str) -> float:
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def get_emission_factor(mode: str) -> float:
         # CO2 kg per km
-        factors = {
-            'walk': 0.0,
-            'bike': 0.0,
-            'public_transport': 0.04,
-            'car': 0.21,
-            'other': 0.15
-        }
-        return factors.get(mode, 0.1)
+        return _EMISSION_FACTORS.get(mode, 0.1)
     
-    def get_action_impact_level(self, action: str) -> str:
-        high_impact = ['switch off unused electronics', 'use public transport']
-        medium_impact = ['reuse items', 'conserve water']
-        
-        if action in high_impact:
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def get_action_impact_level(action: str) -> str:
+        if action in _HIGH_IMPACT_ACTIONS:
             return 'high'
-        elif action in medium_impact:
+        elif action in _MEDIUM_IMPACT_ACTIONS:
             return 'medium'
         else:
             return 'low'
     
     # Sustainability metric calculation methods
     def calculate_meal_carbon_footprint(self, form_data: dict) -> float:
-        meal_type = form_data.get('meal_type', 'mixed')
-        base_scores = {
-            'plant-based': 1.5,
-            'mixed': 4.5,
-            'meat-heavy': 8.5,
-            'snack': 2.0,
-            'drink': 1.0
-        }
+        return self.meal_carbon_footprint(form_data.get('meal_type', 'mixed'), form_data.get('meal_origin', ''))
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def meal_carbon_footprint(meal_type: str, origin: str) -> float:
         
-        base_score = base_scores.get(meal_type, 4.0)
+        base_score = _MEAL_CARBON_BASE.get(meal_type, 4.0)
         
         # Adjust for origin
-        origin = form_data.get('meal_origin', '')
         if 'Locally sourced' in origin or 'Home-grown' in origin:
             base_score *= 0.7
         elif 'Takeaway' in origin:
@@ -632,29 +1313,27 @@ class IntakeHandler(BaseHTTPRequestHandler):
         return round(base_score, 2)
     
     def calculate_meal_water_usage(self, form_data: dict) -> float:
-        meal_type = form_data.get('meal_type', 'mixed')
-        water_usage = {
-            'plant-based': 500,
-            'mixed': 1500, 
-            'meat-heavy': 3000,
-            'snack': 200,
-            'drink': 100
-        }
-        return water_usage.get(meal_type, 1000)
+        return self.meal_water_usage(form_data.get('meal_type', 'mixed'))
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def meal_water_usage(meal_type: str) -> float:
+        return _MEAL_WATER_USAGE.get(meal_type, 1000)
     
     def calculate_meal_land_use(self, form_data: dict) -> float:
-        meal_type = form_data.get('meal_type', 'mixed')
-        land_use = {
-            'plant-based': 1.0,
-            'mixed': 3.0,
-            'meat-heavy': 8.0,
-            'snack': 0.5,
-            'drink': 0.2
-        }
-        return land_use.get(meal_type, 2.0)
+        return self.meal_land_use(form_data.get('meal_type', 'mixed'))
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def meal_land_use(meal_type: str) -> float:
+        return _MEAL_LAND_USE.get(meal_type, 2.0)
     
     def calculate_packaging_score(self, form_data: dict) -> float:
-        origin = form_data.get('meal_origin', '')
+        return self.packaging_score(form_data.get('meal_origin', ''))
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def packaging_score(origin: str) -> float:
         if 'Home-grown' in origin:
             return 10.0  # Best score
         elif 'Locally sourced' in origin:
@@ -667,124 +1346,114 @@ class IntakeHandler(BaseHTTPRequestHandler):
             return 5.0
     
     def calculate_clothing_production_impact(self, form_data: dict) -> float:
-        material = form_data.get('outfit_material', 'mixed')
-        impact_scores = {
-            'mostly natural': 6.0,
-            'mixed': 7.5,
-            'mostly synthetic': 9.0
-        }
-        return impact_scores.get(material, 7.0)
+        return self.clothing_production_impact(form_data.get('outfit_material', 'mixed'))
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def clothing_production_impact(material: str) -> float:
+        return _CLOTHING_PRODUCTION_IMPACT.get(material, 7.0)
     
     def calculate_clothing_durability(self, form_data: dict) -> float:
-        material = form_data.get('outfit_material', 'mixed')
-        durability = {
-            'mostly natural': 8.0,
-            'mixed': 7.0,
-            'mostly synthetic': 6.0
-        }
-        return durability.get(material, 7.0)
+        return self.clothing_durability(form_data.get('outfit_material', 'mixed'))
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def clothing_durability(material: str) -> float:
+        return _CLOTHING_DURABILITY.get(material, 7.0)
     
     def calculate_clothing_recyclability(self, form_data: dict) -> float:
-        material = form_data.get('outfit_material', 'mixed')
-        recyclability = {
-            'mostly natural': 9.0,
-            'mixed': 6.0,
-            'mostly synthetic': 4.0
-        }
-        return recyclability.get(material, 6.0)
+        return self.clothing_recyclability(form_data.get('outfit_material', 'mixed'))
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def clothing_recyclability(material: str) -> float:
+        return _CLOTHING_RECYCLABILITY.get(material, 6.0)
     
     def calculate_mobility_emissions(self, form_data: dict) -> float:
         mode = form_data.get('mobility_mode', 'car')
         distance = self.parse_distance(form_data.get('mobility_distance', '1'))
-        emission_factor = self.get_emission_factor(mode)
+        return self.mobility_emissions(distance, self.get_emission_factor(mode))
+    
+    @staticmethod
+    def mobility_emissions(distance: float, emission_factor: float) -> float:
         return round(distance * emission_factor, 3)
     
     def calculate_mobility_efficiency(self, form_data: dict) -> float:
-        mode = form_data.get('mobility_mode', 'car')
-        efficiency_scores = {
-            'walk': 10.0,
-            'bike': 10.0,
-            'public_transport': 8.0,
-            'car': 4.0,
-            'other': 6.0
-        }
-        return efficiency_scores.get(mode, 5.0)
+        return self.mobility_efficiency(form_data.get('mobility_mode', 'car'))
+    
+    @staticmethod
+    def mobility_efficiency(mode: str) -> float:
+        return _MOBILITY_EFFICIENCY.get(mode, 5.0)
     
     def calculate_mobility_impact(self, form_data: dict) -> float:
-        emissions = self.calculate_mobility_emissions(form_data)
+        return self.mobility_impact(self.calculate_mobility_emissions(form_data))
+    
+    @staticmethod
+    def mobility_impact(emissions: float) -> float:
         if emissions == 0:
             return 10.0
-        elif emissions < 0.5:
-            return 8.0
-        elif emissions < 2.0:
-            return 6.0
-        else:
-            return 3.0
+        return _MOBILITY_IMPACT_LEVELS[bisect.bisect_right(_MOBILITY_IMPACT_THRESHOLDS, emissions)]
     
     def calculate_action_impact(self, action: str) -> float:
-        impact_scores = {
-            'switch off unused electronics': 8.0,
-            'use public transport instead of car': 9.0,
-            'reuse items instead of buying new': 7.0,
-            'conserve water usage': 6.0,
-            'reduce food waste': 8.0,
-            'recycle materials': 6.0
-        }
-        return impact_scores.get(action, 5.0)
+        return _ACTION_IMPACT_SCORES.get(action, 5.0)
     
     def calculate_resource_savings(self, action: str) -> dict:
-        savings = {
-            'switch off unused electronics': {'energy': 0.5, 'cost': 2.0},
-            'use public transport instead of car': {'carbon': 2.1, 'cost': 5.0},
-            'reuse items instead of buying new': {'waste': 0.8, 'cost': 10.0},
-            'conserve water usage': {'water': 50, 'cost': 1.0},
-            'reduce food waste': {'waste': 0.5, 'cost': 3.0},
-            'recycle materials': {'waste': 0.3, 'landfill': 0.2}
-        }
-        return savings.get(action, {'generic': 1.0})
+        return dict(_RESOURCE_SAVINGS.get(action, _GENERIC_SAVINGS))
     
     def get_timestamp(self) -> str:
-        import datetime
         return datetime.datetime.now().isoformat()
     
-    def generate_comprehensive_analysis(self, normalized_items: list, form_data: dict) -> dict:
+    def analyze_and_score(self, normalized_items: list, form_data: dict) -> Tuple[dict, dict]:
+        """Comprehensive analysis and eco score from a single bucketing pass"""
+        buckets = self.bucket_items(normalized_items)
+        return (self.generate_comprehensive_analysis(normalized_items, form_data, buckets),
+                self.calculate_comprehensive_eco_score(normalized_items, form_data, buckets))
+    
+    def generate_comprehensive_analysis(self, normalized_items: list, form_data: dict,
+                                        buckets: Optional[Dict[str, list]] = None) -> dict:
         """Generate comprehensive analysis of normalized items for scoring"""
         
-        total_carbon = sum([
-            item.get('sustainability_metrics', {}).get('carbon_footprint', 0) 
-            for item in normalized_items if 'carbon_footprint' in item.get('sustainability_metrics', {})
-        ])
-        
-        total_emissions = sum([
-            item.get('sustainability_metrics', {}).get('carbon_emissions', 0)
-            for item in normalized_items if 'carbon_emissions' in item.get('sustainability_metrics', {})
-        ])
+        if buckets is None:
+            buckets = self.bucket_items(normalized_items)
         
-        action_count = len([item for item in normalized_items if item['type'] == 'environmental_action'])
+        total_carbon = 0
+        total_emissions = 0
+        for item in normalized_items:
+            try:
+                metrics = item['sustainability_metrics']
+            except KeyError:
+                continue
+            # Each item carries at most one of these, so look them up with defaults
+            total_carbon += metrics.get('carbon_footprint', 0)
+            total_emissions += metrics.get('carbon_emissions', 0)
         
         return {
             "overall_impact": {
                 "total_carbon_footprint_kg": round(total_carbon + total_emissions, 2),
-                "environmental_actions_taken": action_count,
+                "environmental_actions_taken": len(buckets['environmental_action']),
                 "sustainability_rating": self.calculate_overall_rating(normalized_items)
             },
             "category_breakdown": {
-                "meal": self.analyze_meal_items(normalized_items),
-                "transportation": self.analyze_transport_items(normalized_items), 
-                "clothing": self.analyze_clothing_items(normalized_items),
-                "actions": self.analyze_action_items(normalized_items)
+                "meal": self.analyze_meal_items(buckets['meal']),
+                "transportation": self.analyze_transport_items(buckets['transportation']), 
+                "clothing": self.analyze_clothing_items(buckets['clothing']),
+                "actions": self.analyze_action_items(buckets['environmental_action'])
             },
-            "recommendations": self.generate_recommendations(normalized_items, form_data)
+            "recommendations": self.generate_recommendations(buckets, form_data)
         }
     
-    def calculate_comprehensive_eco_score(self, normalized_items: list, form_data: dict) -> dict:
+    def calculate_comprehensive_eco_score(self, normalized_items: list, form_data: dict,
+                                          buckets: Optional[Dict[str, list]] = None) -> dict:
         """Calculate comprehensive eco-score based on normalized items"""
         
+        if buckets is None:
+            buckets = self.bucket_items(normalized_items)
+        
         # Base scores for different categories
-        meal_score = self.score_meal_items(normalized_items)
-        transport_score = self.score_transport_items(normalized_items)
-        clothing_score = self.score_clothing_items(normalized_items)
-        action_bonus = self.score_action_items(normalized_items)
+        meal_score = self.score_meal_items(buckets['meal'])
+        transport_score = self.score_transport_items(buckets['transportation'])
+        clothing_score = self.score_clothing_items(buckets['clothing'])
+        action_bonus = self.score_action_items(buckets['environmental_action'])
         
         # Weighted overall score
         overall_score = (
@@ -807,8 +1476,27 @@ class IntakeHandler(BaseHTTPRequestHandler):
         }
     
     # Analysis helper methods
+    @staticmethod
+    def bucket_items(items: list) -> Dict[str, list]:
+        """Group normalized items by type in a single pass"""
+        buckets = {item_type: [] for item_type in _ITEM_TYPES}
+        for item in items:
+            buckets.setdefault(item['type'], []).append(item)
+        return buckets
+    
+    @staticmethod
+    def sum_metric(items: list, metric: str) -> float:
+        """Total of one sustainability metric over items (missing counts as 0)"""
+        total = 0
+        for item in items:
+            try:
+                total += item['sustainability_metrics'][metric]
+            except KeyError:
+                pass
+        return total
+    
     def calculate_overall_rating(self, items: list) -> str:
-        avg_score = sum([item.get('confidence', 0.5) for item in items]) / len(items) if items else 0.5
+        avg_score = sum(item.get('confidence', 0.5) for item in items) / len(items) if items else 0.5
         if avg_score > 0.8:
             return "Excellent"
         elif avg_score > 0.6:
@@ -818,8 +1506,7 @@ class IntakeHandler(BaseHTTPRequestHandler):
         else:
             return "Needs Improvement"
     
-    def analyze_meal_items(self, items: list) -> dict:
-        meal_items = [item for item in items if item['type'] == 'meal']
+    def analyze_meal_items(self, meal_items: list) -> dict:
         if not meal_items:
             return {}
         
@@ -831,8 +1518,7 @@ class IntakeHandler(BaseHTTPRequestHandler):
             "local_sourcing": meal.get('attributes', {}).get('source_local', False)
         }
     
-    def analyze_transport_items(self, items: list) -> dict:
-        transport_items = [item for item in items if item['type'] == 'transportation']
+    def analyze_transport_items(self, transport_items: list) -> dict:
         if not transport_items:
             return {}
         
@@ -843,8 +1529,7 @@ class IntakeHandler(BaseHTTPRequestHandler):
             "efficiency_score": transport.get('sustainability_metrics', {}).get('energy_efficiency', 0)
         }
     
-    def analyze_clothing_items(self, items: list) -> dict:
-        clothing_items = [item for item in items if item['type'] == 'clothing']
+    def analyze_clothing_items(self, clothing_items: list) -> dict:
         if not clothing_items:
             return {}
         
@@ -855,20 +1540,18 @@ class IntakeHandler(BaseHTTPRequestHandler):
             "sustainability_score": clothing.get('sustainability_metrics', {}).get('production_impact', 0)
         }
     
-    def analyze_action_items(self, items: list) -> dict:
-        action_items = [item for item in items if item['type'] == 'environmental_action']
+    def analyze_action_items(self, action_items: list) -> dict:
         return {
             "total_actions": len(action_items),
             "action_types": [item.get('attributes', {}).get('action_type') for item in action_items],
-            "average_impact": sum([item.get('sustainability_metrics', {}).get('positive_impact_score', 0) 
-                                 for item in action_items]) / len(action_items) if action_items else 0
+            "average_impact": self.sum_metric(action_items, 'positive_impact_score') / len(action_items) if action_items else 0
         }
     
-    def generate_recommendations(self, items: list, form_data: dict) -> list:
+    def generate_recommendations(self, buckets: Dict[str, list], form_data: dict) -> list:
         recommendations = []
         
         # Meal recommendations
-        meal_items = [item for item in items if item['type'] == 'meal']
+        meal_items = buckets['meal']
         if meal_items:
             meal = meal_items[0]
             if meal.get('category') == 'meat-heavy':
@@ -877,37 +1560,27 @@ class IntakeHandler(BaseHTTPRequestHandler):
                 recommendations.append("Try to source food locally to reduce transportation emissions")
         
         # Transport recommendations  
-        transport_items = [item for item in items if item['type'] == 'transportation']
+        transport_items = buckets['transportation']
         if transport_items:
             transport = transport_items[0]
             if transport.get('category') == 'car':
                 recommendations.append("Consider walking, cycling, or public transport for short distances")
         
         # Action recommendations
-        action_items = [item for item in items if item['type'] == 'environmental_action']
-        if len(action_items) < 2:
+        if len(buckets['environmental_action']) < 2:
             recommendations.append("Try to incorporate more daily environmental actions")
         
         return recommendations[:3]  # Return top 3 recommendations
     
     # Scoring helper methods
-    def score_meal_items(self, items: list) -> float:
-        meal_items = [item for item in items if item['type'] == 'meal']
+    def score_meal_items(self, meal_items: list) -> float:
         if not meal_items:
             return 50.0
         
         meal = meal_items[0]
         category = meal.get('category', 'mixed')
         
-        base_scores = {
-            'plant-based': 90,
-            'mixed': 70,
-            'meat-heavy': 40,
-            'snack': 60,
-            'drink': 80
-        }
-        
-        score = base_scores.get(category, 60)
+        score = _MEAL_ITEM_SCORES.get(category, 60)
         
         # Bonus for local sourcing
         if meal.get('attributes', {}).get('source_local'):
@@ -919,8 +1592,7 @@ class IntakeHandler(BaseHTTPRequestHandler):
         
         return min(100, max(0, score))
     
-    def score_transport_items(self, items: list) -> float:
-        transport_items = [item for item in items if item['type'] == 'transportation']
+    def score_transport_items(self, transport_items: list) -> float:
         if not transport_items:
             return 70.0
         
@@ -928,47 +1600,25 @@ class IntakeHandler(BaseHTTPRequestHandler):
         efficiency = transport.get('sustainability_metrics', {}).get('energy_efficiency', 5.0)
         return min(100, efficiency * 10)
     
-    def score_clothing_items(self, items: list) -> float:
-        clothing_items = [item for item in items if item['type'] == 'clothing']
+    def score_clothing_items(self, clothing_items: list) -> float:
         if not clothing_items:
             return 70.0
         
         clothing = clothing_items[0]
         category = clothing.get('category', 'mixed')
         
-        scores = {
-            'mostly natural': 85,
-            'mixed': 70,
-            'mostly synthetic': 55
-        }
-        
-        return scores.get(category, 70)
+        return _CLOTHING_ITEM_SCORES.get(category, 70)
     
-    def score_action_items(self, items: list) -> float:
-        action_items = [item for item in items if item['type'] == 'environmental_action']
+    def score_action_items(self, action_items: list) -> float:
         if not action_items:
             return 0.0
         
-        total_impact = sum([
-            item.get('sustainability_metrics', {}).get('positive_impact_score', 0)
-            for item in action_items
-        ])
+        total_impact = self.sum_metric(action_items, 'positive_impact_score')
         
         return min(100, total_impact * len(action_items))
     
     def get_grade(self, score: float) -> str:
-        if score >= 90:
-            return "A+"
-        elif score >= 80:
-            return "A"
-        elif score >= 70:
-            return "B"
-        elif score >= 60:
-            return "C"
-        elif score >= 50:
-            return "D"
-        else:
-            return "F"
+        return _GRADE_LABELS[bisect.bisect_right(_GRADE_THRESHOLDS, score)]
     
     def get_percentile(self, score: float) -> float:
         # Simple percentile calculation based on score
@@ -976,23 +1626,11 @@ class IntakeHandler(BaseHTTPRequestHandler):
     
     def get_meal_materials(self, meal_type: str) -> list:
         """Get materials based on meal type"""
-        materials_map = {
-            "plant-based": ["vegetables", "grains", "legumes", "fruits"],
-            "mixed": ["vegetables", "protein", "grains"],
-            "meat-heavy": ["protein", "animal products"],
-            "snack": ["processed", "packaged"],
-            "drink": ["liquid", "beverage"]
-        }
-        return materials_map.get(meal_type, ["mixed"])
+        return list(_MEAL_MATERIALS.get(meal_type, ("mixed",)))
     
     def get_outfit_materials(self, outfit_type: str) -> list:
         """Get materials based on outfit type"""
-        materials_map = {
-            "mostly natural": ["cotton", "wool", "linen", "silk"],
-            "mostly synthetic": ["polyester", "nylon", "acrylic"],
-            "mixed": ["cotton", "polyester", "blend"]
-        }
-        return materials_map.get(outfit_type, ["mixed"])
+        return list(_OUTFIT_MATERIALS.get(outfit_type, ("mixed",)))
     
     def generate_analysis(self, form_data: dict) -> dict:
         """Generate intelligent analysis of user choices"""
@@ -1094,26 +1732,11 @@ class IntakeHandler(BaseHTTPRequestHandler):
     
     def score_meal_choice(self, meal_type: str) -> int:
         """Score meal choice out of 30 points"""
-        scores = {
-            "plant-based": 30,
-            "mixed": 20,
-            "meat-heavy": 10,
-            "snack": 15,
-            "drink": 12
-        }
-        return scores.get(meal_type, 15)
+        return _MEAL_CHOICE_SCORES.get(meal_type, 15)
     
     def score_mobility_choice(self, mobility: str) -> int:
         """Score mobility choice out of 25 points"""
-        scores = {
-            "walk": 25,
-            "bike": 25,
-            "bus": 18,
-            "train": 18,
-            "car": 8,
-            "other": 12
-        }
-        return scores.get(mobility, 12)
+        return _MOBILITY_CHOICE_SCORES.get(mobility, 12)
     
     def score_daily_actions(self, actions: list) -> int:
         """Score daily actions out of 25 points"""
@@ -1121,39 +1744,18 @@ class IntakeHandler(BaseHTTPRequestHandler):
             return 0
         
         # Each sustainable action is worth points
-        action_scores = {
-            "Used a reusable bottle/cup": 5,
-            "Turned off lights/electronics": 4,
-            "Recycled something": 4,
-            "Chose a plant-based meal": 6,
-            "Used public/shared transport": 6,
-            "None of these": 0
-        }
-        
         total_score = 0
         for action in actions:
-            total_score += action_scores.get(action, 0)
+            total_score += _DAILY_ACTION_SCORES.get(action, 0)
         
         return min(total_score, 25)  # Cap at 25 points
     
     def score_outfit_choice(self, outfit: str) -> int:
         """Score outfit choice out of 10 points"""
-        scores = {
-            "mostly natural": 10,
-            "mixed": 6,
-            "mostly synthetic": 3
-        }
-        return scores.get(outfit, 5)
+        return _OUTFIT_CHOICE_SCORES.get(outfit, 5)
     
     def get_eco_level(self, score: int) -> str:
-        if score >= 80:
-            return "🌟 Eco Champion"
-        elif score >= 60:
-            return "🌱 Green Guardian"
-        elif score >= 40:
-            return "🌿 Earth Friend"
-        else:
-            return "🌍 Climate Beginner"
+        return _ECO_LEVELS[bisect.bisect_right(_ECO_LEVEL_THRESHOLDS, score)]
     
     def analyze_reflection(self, reflection_text: str) -> dict:
         """Analyze reflection text using Mistral AI to provide personalized insights and score out of 10"""
@@ -1176,132 +1778,84 @@ class IntakeHandler(BaseHTTPRequestHandler):
                 "scoring_criteria": "Basic score - AI analysis unavailable"
             }
         
+        if not os.getenv('MISTRAL_API_KEY'):
+            return {
+                "insights": "AI analysis not available - API key not configured.",
+                "themes": [],
+                "encouragement": "Thank you for sharing your sustainability perspective! 🌱",
+                "reflection_score": 3,
+                "scoring_criteria": "Basic score - API key not configured"
+            }
+        
+        # Resubmitted reflections reuse the earlier AI analysis instead of calling Mistral again
+        return dict(self.request_reflection_analysis(reflection_text))
+    
+    @staticmethod
+    def request_reflection_analysis(reflection_text: str) -> dict:
+        """Score a reflection with Mistral AI (successful analyses are cached)"""
+        cached = load_cached_reflection(reflection_text)
+        if cached is not None:
+            return cached
+        
         try:
             # Use Mistral AI to analyze the reflection
-            import requests
-            import os
-            
             api_key = os.getenv('MISTRAL_API_KEY')
-            if not api_key:
-                return {
-                    "insights": "AI analysis not available - API key not configured.",
-                    "themes": [],
-                    "encouragement": "Thank you for sharing your sustainability perspective! 🌱",
-                    "reflection_score": 3,
-                    "scoring_criteria": "Basic score - API key not configured"
-                }
-            
-            prompt = f"""
-            Analyze this person's reflection on sustainability: "{reflection_text}"
-            
-            Score the reflection out of 10 points based on these criteria:
-            - Depth of understanding (0-3 points): Shows genuine comprehension of sustainability concepts
-            - Personal connection (0-2 points): Demonstrates personal relevance or commitment  
-            - Specificity (0-2 points): Includes concrete examples or specific aspects
-            - Forward-thinking (0-2 points): Mentions future implications, responsibility, or action
-            - Clarity (0-1 point): Well-articulated and coherent response
-            
-            Provide response in JSON format:
-            {{
-                "insights": "A personalized 1-2 sentence insight about their understanding",
-                "themes": ["list", "of", "key", "sustainability", "themes"],
-                "encouragement": "An encouraging message that builds on their perspective",
-                "reflection_score": 0-10,
-                "scoring_criteria": "Brief explanation of why this score was given",
-                "strengths": ["what", "was", "particularly", "good"],
-                "suggestions": ["gentle", "suggestions", "for", "deeper", "thinking"]
-            }}
             
-            Guidelines:
-            - Be encouraging and constructive
-            - Score fairly but generously - most sincere attempts should get 5+ points
-            - Identify key themes like: future generations, personal responsibility, environmental protection, systems thinking, etc.
-            - Keep feedback supportive and educational
-            - Even simple responses that show genuine thought should receive reasonable scores
-            """
+            # Only the reflection text varies; the prompt frame and request options are constants
+            prompt = _REFLECTION_PROMPT_PREFIX + reflection_text + _REFLECTION_PROMPT_SUFFIX
             
             headers = {
                 'Authorization': f'Bearer {api_key}',
                 'Content-Type': 'application/json'
             }
             
-            payload = {
-                "model": "mistral-small-latest",
-                "messages": [
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                "max_tokens": 400,
-                "temperature": 0.2  # Lower temperature for more consistent scoring
-            }
+            payload = {**_REFLECTION_REQUEST_OPTIONS, "messages": [{"role": "user", "content": prompt}]}
             
-            response = requests.post(
-                "https://api.mistral.ai/v1/chat/completions",
+            response = _mistral_session().post(
+                _MISTRAL_CHAT_URL,
                 headers=headers,
                 json=payload,
                 timeout=15
             )
             
             if response.status_code == 200:
-                result = response.json()
+                result = _json_loads(response.content)
                 content = result['choices'][0]['message']['content']
                 
-                # Extract JSON from response
-                import json
+                # JSON mode: the message content is the analysis object itself
                 try:
-                    json_start = content.find('{')
-                    json_end = content.rfind('}') + 1
-                    if json_start >= 0 and json_end > json_start:
-                        json_str = content[json_start:json_end]
-                        analysis = json.loads(json_str)
-                        
-                        # Ensure reflection_score is within range 0-10
-                        score = analysis.get('reflection_score', 5)
-                        analysis['reflection_score'] = min(max(score, 0), 10)
-                        
-                        # Ensure required fields exist
-                        analysis.setdefault('insights', 'Your reflection shows thoughtful engagement with sustainability.')
-                        analysis.setdefault('themes', ['sustainability awareness'])
-                        analysis.setdefault('encouragement', 'Thank you for sharing your perspective!')
-                        analysis.setdefault('scoring_criteria', 'AI analysis completed')
-                        analysis.setdefault('strengths', ['thoughtful response'])
-                        analysis.setdefault('suggestions', [])
-                        
-                        return analysis
-                    else:
-                        raise ValueError("No JSON found in response")
-                        
-                except (json.JSONDecodeError, ValueError) as e:
-                    print(f"JSON parsing error: {e}")
-                    # Fallback response with estimated score based on text length and content
-                    word_count = len(reflection_text.split())
+                    analysis = _json_loads(content)
+                    if not isinstance(analysis, dict):
+                        raise ValueError("Expected a JSON object in response")
                     
-                    # Basic scoring based on length and keyword presence
-                    score = 3  # Base score for providing reflection
+                    # Ensure reflection_score is within range 0-10
+                    score = analysis.get('reflection_score', 5)
+                    analysis['reflection_score'] = min(max(score, 0), 10)
                     
-                    if word_count >= 15:  # Longer responses
-                        score += 2
-                    elif word_count >= 8:  # Medium responses
-                        score += 1
+                    # Ensure required fields exist
+                    analysis.setdefault('insights', 'Your reflection shows thoughtful engagement with sustainability.')
+                    analysis.setdefault('themes', ['sustainability awareness'])
+                    analysis.setdefault('encouragement', 'Thank you for sharing your perspective!')
+                    analysis.setdefault('scoring_criteria', 'AI analysis completed')
+                    analysis.setdefault('strengths', ['thoughtful response'])
+                    analysis.setdefault('suggestions', [])
                     
-                    # Check for sustainability keywords
-                    sustainability_keywords = [
-                        'future', 'generation', 'environment', 'planet', 'responsible', 
-                        'protect', 'care', 'preserve', 'reduce', 'recycle', 'green',
-                        'climate', 'carbon', 'renewable', 'conscious', 'mindful'
-                    ]
+                    store_cached_reflection(reflection_text, analysis)
+                    return analysis
                     
-                    keyword_count = sum(1 for word in sustainability_keywords 
-                                      if word in reflection_text.lower())
-                    score += min(keyword_count, 3)  # Up to 3 bonus points for keywords
+                except _JSON_DECODE_ERRORS as e:
+                    logger.warning("JSON parsing error: %s", e)
+                    # Fallback response with estimated score based on text length and content
+                    word_count = len(reflection_text.split())
+                    
+                    # Check for sustainability keywords (distinct keywords present)
+                    keyword_count = len(set(_SUSTAINABILITY_KEYWORD_PATTERN.findall(reflection_text.lower())))
                     
                     return {
                         "insights": "Your reflection demonstrates engagement with sustainability concepts.",
                         "themes": ["sustainability awareness", "personal reflection"],
                         "encouragement": "Thank you for taking time to reflect on this important topic! 🌍",
-                        "reflection_score": min(score, 10),
+                        "reflection_score": _fallback_reflection_score(word_count, keyword_count),
                         "scoring_criteria": f"Scored based on content analysis ({word_count} words, sustainability themes present)",
                         "strengths": ["thoughtful engagement"],
                         "suggestions": ["continue exploring sustainability in daily life"]
@@ -1322,7 +1876,7 @@ class IntakeHandler(BaseHTTPRequestHandler):
                 }
                 
         except Exception as e:
-            print(f"Error analyzing reflection: {str(e)}")
+            logger.error("Error analyzing reflection: %s", e)
             # Fallback scoring based on basic text analysis
             word_count = len(reflection_text.split())
             fallback_score = min(4 + (word_count // 8), 7)  # 4-7 points
@@ -1337,26 +1891,79 @@ class IntakeHandler(BaseHTTPRequestHandler):
                 "suggestions": []
             }
     
-    def send_json_response(self, data: Dict[str, Any], status: int = 200):
+    def send_json_response(self, data: Any, status: int = 200):
         """Send a JSON response"""
-        response_json = json.dumps(data).encode('utf-8')
+        response_json = _json_dumps(data)
+        content_encoding = None
+        if len(response_json) >= _COMPRESS_MIN_SIZE:
+            content_encoding, response_json = self.compress_body(response_json)
         
         self.send_response(status)
         self.send_header('Content-Type', 'application/json')
         self.send_header('Access-Control-Allow-Origin', '*')
         self.send_header('Access-Control-Allow-Credentials', 'true')
+        self.send_header('Vary', 'Accept-Encoding')
+        if content_encoding:
+            self.send_header('Content-Encoding', content_encoding)
         self.send_header('Content-Length', str(len(response_json)))
-        self.end_headers()
-        self.wfile.write(response_json)
+        # A request body left unread (early error exit) would be parsed as the
+        # next keep-alive request, so drop the connection instead
+        if getattr(self, 'body_pending', False):
+            self.close_connection = True
+        # Echo the connection state explicitly so HTTP/1.0 clients and proxies keep it open too
+        self.send_header('Connection', 'close' if self.close_connection else 'keep-alive')
+        # sendmsg() is Unix-only and unsupported on SSL sockets; elsewhere use the buffered write
+        if (len(response_json) >= _SCATTER_WRITE_MIN_SIZE and getattr(self, '_headers_buffer', None)
+                and hasattr(self.connection, 'sendmsg')):
+            self.send_head_and_body(response_json)
+        else:
+            self.end_headers()
+            self.wfile.write(response_json)
+    
+    def compress_body(self, body: bytes) -> Tuple[Optional[str], bytes]:
+        """Compress a response body for the client's Accept-Encoding (br, then gzip)"""
+        codings = accepted_encodings(self.headers.get('Accept-Encoding', ''))
+        if brotli is not None and 'br' in codings:
+            return 'br', brotli.compress(body, quality=_BROTLI_QUALITY)
+        if 'gzip' in codings:
+            return 'gzip', gzip.compress(body, compresslevel=_GZIP_LEVEL)
+        return None, body
+    
+    def send_head_and_body(self, body: bytes):
+        """Finish the headers and send them with the body in a single scatter-gather write
+        
+        Above the wfile buffer size, a buffered write costs one send for the
+        headers and another for the body; sendmsg() takes both buffers as-is.
+        """
+        self._headers_buffer.append(b"\r\n")
+        head = b"".join(self._headers_buffer)
+        self._headers_buffer = []
+        self.wfile.flush()
+        
+        try:
+            sent = self.connection.sendmsg([head, body])
+        except NotImplementedError:
+            # e.g. an SSL-wrapped socket: nothing was sent yet, write both normally
+            self.wfile.write(head)
+            self.wfile.write(body)
+            return
+        # A partial send can stop anywhere; finish whatever is left
+        if sent < len(head):
+            self.connection.sendall(head[sent:])
+            self.connection.sendall(body)
+        elif sent < len(head) + len(body):
+            self.connection.sendall(memoryview(body)[sent - len(head):])
     
     def log_message(self, format, *args):
         """Override to provide cleaner logging"""
-        print(f"[{self.address_string()}] {format % args}")
+        logger.info("[%s] %s", self.address_string(), format % args)
 
 def run_server(port: int = 8000):
     """Run the simple HTTP server"""
     server_address = ('', port)
-    httpd = HTTPServer(server_address, IntakeHandler)
+    # One thread per connection so slow Pixtral/Open Food Facts calls don't block other requests
+    httpd = ThreadingHTTPServer(server_address, IntakeHandler)
+    httpd.daemon_threads = True
     
     print(f"🌱 EcoBee Simple Server starting on http://localhost:{port}")
     print("📍 Available endpoints:")
@@ -1365,6 +1972,9 @@ def run_server(port: int = 8000):
     print("   POST /api/score")
     print("   POST /api/scan-barcode")
     print("   POST /api/product-sustainability")
+    print("   GET  /api/reflection/<id>")
+    print(f"⚡ JSON backend: {JSON_BACKEND}")
+    print(f"🧠 Reflection analysis jobs: {'✅ Enabled' if REFLECTION_JOBS_ENABLED else '❌ Disabled (set ECOBEE_REFLECTION_JOBS=1)'}")
     print(f"📱 Barcode Scanner: {'✅ Enabled (Pixtral)' if BARCODE_SCANNER_AVAILABLE else '❌ Disabled'}")
     print(f"🌱 Product Analysis: {'✅ Enabled (AI-powered)' if BARCODE_SCANNER_AVAILABLE else '❌ Disabled'}")
     if BARCODE_SCANNER_AVAILABLE:
@@ -1372,11 +1982,14 @@ def run_server(port: int = 8000):
     print("\n🔗 Frontend should connect to: http://localhost:8000")
     print("⏹️  Press Ctrl+C to stop the server\n")
     
+    listener = configure_logging()
     try:
         httpd.serve_forever()
     except KeyboardInterrupt:
         print("\n🛑 Server stopped")
         httpd.shutdown()
+    finally:
+        listener.stop()
 
 if __name__ == '__main__':
     run_server()
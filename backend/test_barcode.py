@@ -5,37 +5,33 @@ Test script to debug barcode product lookup
 
 import sys
 import os
+from concurrent.futures import ThreadPoolExecutor
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from product_sustainability import create_sustainability_analyzer
 
-def test_barcode_lookup(barcode):
-    """Test barcode lookup"""
+def test_barcode_lookup(barcode, verbose=False):
+    """Test barcode lookup (pass a list of barcodes to look them up concurrently)
+    
+    verbose queries and reports both sources; otherwise UPCitemdb is only
+    called when Open Food Facts has no match.
+    """
+    if isinstance(barcode, (list, tuple)):
+        return test_barcode_batch(barcode)
+    
     print(f"Testing barcode: {barcode}")
     
     analyzer = create_sustainability_analyzer()
     
-    # Test Open Food Facts first
-    print("\n1. Testing Open Food Facts API...")
-    basic_info = analyzer._get_openfoodfacts_data(barcode)
-    if basic_info:
-        print(f"✅ Found product in OpenFoodFacts: {basic_info['name']}")
-        print(f"   Brand: {basic_info['brand']}")
-        print(f"   Category: {basic_info['category']}")
-        print(f"   Ingredients: {basic_info['ingredients'][:3]}...")  # First 3 ingredients
+    if verbose:
+        print_source_diagnostics(analyzer, barcode)
     else:
-        print("❌ Not found in OpenFoodFacts")
-    
-    # Test UPC Item DB if not found
-    if not basic_info:
-        print("\n2. Testing UPCitemdb API...")
-        basic_info = analyzer._get_upcitemdb_data(barcode)
+        print("\n1. Looking up basic product data...")
+        basic_info = analyzer._get_openfoodfacts_data(barcode) or analyzer._get_upcitemdb_data(barcode)
         if basic_info:
-            print(f"✅ Found product in UPCitemdb: {basic_info['name']}")
-            print(f"   Brand: {basic_info['brand']}")
-            print(f"   Category: {basic_info['category']}")
+            print(f"✅ Found product in {basic_info['source']}: {basic_info['name']}")
         else:
-            print("❌ Not found in UPCitemdb")
+            print("❌ Not found in OpenFoodFacts or UPCitemdb")
     
     # Test full product info lookup
     print("\n3. Testing full product analysis...")
@@ -52,6 +48,47 @@ def test_barcode_lookup(barcode):
     
     return product_info
 
+def print_source_diagnostics(analyzer, barcode):
+    """Query both product sources concurrently and report each one's result"""
+    # Total wait is the slower lookup, not the sum
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        off_future = pool.submit(analyzer._get_openfoodfacts_data, barcode)
+        upc_future = pool.submit(analyzer._get_upcitemdb_data, barcode)
+    
+    print("\n1. Testing Open Food Facts API...")
+    off_info = off_future.result()
+    if off_info:
+        print(f"✅ Found product in OpenFoodFacts: {off_info['name']}")
+        print(f"   Brand: {off_info['brand']}")
+        print(f"   Category: {off_info['category']}")
+        print(f"   Ingredients: {off_info['ingredients'][:3]}...")  # First 3 ingredients
+    else:
+        print("❌ Not found in OpenFoodFacts")
+    
+    print("\n2. Testing UPCitemdb API...")
+    upc_info = upc_future.result()
+    if upc_info:
+        print(f"✅ Found product in UPCitemdb: {upc_info['name']}")
+        print(f"   Brand: {upc_info['brand']}")
+        print(f"   Category: {upc_info['category']}")
+    else:
+        print("❌ Not found in UPCitemdb")
+
+def test_barcode_batch(barcodes):
+    """Test concurrent full product analysis for several barcodes"""
+    print(f"Testing {len(barcodes)} barcodes concurrently")
+    
+    analyzer = create_sustainability_analyzer()
+    results = analyzer.get_products_info(barcodes)
+    
+    for barcode, product_info in zip(barcodes, results):
+        if product_info:
+            print(f"✅ {barcode}: {product_info.name} - {product_info.sustainability_score.overall_score}/100")
+        else:
+            print(f"❌ {barcode}: full analysis failed")
+    
+    return results
+
 if __name__ == "__main__":
     # Test with the barcode you mentioned
     test_barcode = "5012035927608"
@@ -59,7 +96,7 @@ if __name__ == "__main__":
     print("🧪 Barcode Product Lookup Test")
     print("=" * 50)
     
-    result = test_barcode_lookup(test_barcode)
+    result = test_barcode_lookup(test_barcode, verbose="--verbose" in sys.argv)
     
     if result:
         print("\n🎉 Test completed successfully!")
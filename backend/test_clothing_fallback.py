@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Test script to check the batched clothing fallback against the scalar one
+"""
+
+import sys
+import os
+from dataclasses import asdict
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from product_sustainability import create_sustainability_analyzer
+
+# Sample clothing products covering each heuristic branch
+SAMPLE_PRODUCTS = [
+    {"name": "Plain tee", "brand": "Generic", "materials": []},
+    {"name": "Organic tee", "brand": "Patagonia", "materials": ["Organic Cotton"],
+     "brand_sustainability": {"sustainability_rating": "A+", "certifications": ["Fair Trade", "B Corp"]}},
+    {"name": "Linen shirt", "brand": "Everlane", "materials": ["linen", "Organic cotton", "elastane"],
+     "brand_sustainability": {"sustainability_rating": "B+", "certifications": ["GOTS"]}},
+    {"name": "Party dress", "brand": "SHEIN", "materials": ["polyester"]},
+    {"name": "Recycled jacket", "brand": "Primark Essentials", "materials": ["Recycled Polyester", "recycled polyester"],
+     "brand_sustainability": {"sustainability_rating": "C"}},
+    {"name": "Hemp bundle", "brand": "Fashion Nova", "materials": ["hemp", "bamboo", "linen", "hemp", "organic cotton", "recycled polyester"],
+     "brand_sustainability": {"sustainability_rating": "A"}},
+    {"name": "Basic jeans", "brand": "Levi's", "materials": ["cotton", "denim"],
+     "brand_sustainability": {"sustainability_rating": "B", "certifications": []}},
+    {"name": "No brand", "materials": ["wool"]},
+]
+
+def test_clothing_fallback(products=SAMPLE_PRODUCTS):
+    """Score products with both fallbacks and report any item where they disagree"""
+    print(f"Comparing fallback scores for {len(products)} products")
+
+    analyzer = create_sustainability_analyzer()
+    batch_scores = analyzer._batch_fallback_clothing(products)
+
+    if len(batch_scores) != len(products):
+        print(f"❌ Batch returned {len(batch_scores)} scores for {len(products)} products")
+        return False
+
+    mismatches = 0
+    for product, batch_score in zip(products, batch_scores):
+        scalar_score = analyzer._create_fallback_clothing_sustainability_score(product)
+        if asdict(batch_score) == asdict(scalar_score):
+            print(f"✅ {product['name']}: {batch_score.overall_score}/100")
+        else:
+            mismatches += 1
+            print(f"❌ {product['name']}: batch {asdict(batch_score)} != scalar {asdict(scalar_score)}")
+
+    if analyzer._batch_fallback_clothing([]) != []:
+        print("❌ Empty batch should return an empty list")
+        return False
+
+    return mismatches == 0
+
+if __name__ == "__main__":
+    print("🧪 Clothing Fallback Batch vs Scalar Test")
+    print("=" * 50)
+
+    if test_clothing_fallback():
+        print("\n🎉 Batch and scalar fallbacks agree!")
+    else:
+        print("\n❌ Test failed - batch and scalar fallbacks disagree")
+        sys.exit(1)
@@ -4,9 +4,30 @@ Test script for the enhanced /api/intake endpoint
 This validates that the endpoint meets project deliverable requirements
 """
 
+import atexit
+import http.client
+import io
 import json
-import urllib.request
-import urllib.parse
+import operator
+import sys
+
+# Parse response bytes directly with orjson when installed
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# One persistent connection reused by every request in this script
+INTAKE_HOST = "localhost"
+INTAKE_PORT = 8000
+INTAKE_PATH = "/api/intake"
+CONNECTION = http.client.HTTPConnection(INTAKE_HOST, INTAKE_PORT, timeout=30)
+atexit.register(CONNECTION.close)
+
+# Fields the Scoring Engine needs on every normalized item
+REQUIRED_ITEM_FIELDS = ('id', 'type', 'category', 'attributes', 'sustainability_metrics')
+get_required_fields = operator.itemgetter(*REQUIRED_ITEM_FIELDS)
 
 def test_intake_endpoint():
     """Test the enhanced /api/intake endpoint for normalized output"""
@@ -26,19 +47,19 @@ def test_intake_endpoint():
     # Convert to JSON
     json_data = json.dumps(test_data).encode('utf-8')
     
-    # Create request
-    url = "http://localhost:8000/api/intake"
-    req = urllib.request.Request(url, data=json_data)
-    req.add_header('Content-Type', 'application/json')
-    
     try:
         print("🧪 Testing enhanced /api/intake endpoint...")
         print(f"📤 Sending data: {test_data}")
         print()
         
         # Make request
-        with urllib.request.urlopen(req) as response:
-            response_data = json.loads(response.read().decode())
+        CONNECTION.request('POST', INTAKE_PATH, body=json_data,
+                           headers={'Content-Type': 'application/json'})
+        response = CONNECTION.getresponse()
+        response_body = response.read()
+        if response.status != 200:
+            raise RuntimeError(f"HTTP Error {response.status}: {response.reason}")
+        response_data = _json_loads(response_body)
             
         print("✅ Response received successfully!")
         print("📨 Full Response:")
@@ -54,27 +75,36 @@ def test_intake_endpoint():
             items = response_data['normalized_items']
             print(f"✅ Found normalized_items: {len(items)} items")
             
-            # Check item structure
+            # Check item structure and scoring readiness in a single pass; the
+            # per-item report is collected and written to stdout in one go
+            report = io.StringIO()
+            all_have_metrics = all_have_confidence = True
             for i, item in enumerate(items):
-                print(f"   📦 Item {i+1}: {item.get('type', 'unknown')} - {item.get('category', 'unknown')}")
+                report.write(f"   📦 Item {i+1}: {item.get('type', 'unknown')} - {item.get('category', 'unknown')}\n")
                 
-                # Check required fields for scoring engine
-                required_fields = ['id', 'type', 'category', 'attributes', 'sustainability_metrics']
-                missing_fields = [field for field in required_fields if field not in item]
+                # Check required fields for scoring engine (one C-level lookup on the happy path)
+                try:
+                    get_required_fields(item)
+                    missing_fields = []
+                except KeyError:
+                    missing_fields = [field for field in REQUIRED_ITEM_FIELDS if field not in item]
+                all_have_metrics = all_have_metrics and 'sustainability_metrics' in item
+                all_have_confidence = all_have_confidence and 'confidence' in item
                 
                 if missing_fields:
-                    print(f"   ⚠️  Missing fields: {missing_fields}")
+                    report.write(f"   ⚠️  Missing fields: {missing_fields}\n")
                 else:
-                    print(f"   ✅ All required fields present")
+                    report.write("   ✅ All required fields present\n")
+            sys.stdout.write(report.getvalue())
             
             print()
             print("🎯 SCORING ENGINE READINESS:")
-            if all('sustainability_metrics' in item for item in items):
+            if all_have_metrics:
                 print("✅ All items have sustainability_metrics for scoring")
             else:
                 print("⚠️  Some items missing sustainability_metrics")
                 
-            if all('confidence' in item for item in items):
+            if all_have_confidence:
                 print("✅ All items have confidence scores")
             else:
                 print("⚠️  Some items missing confidence scores")
@@ -111,7 +141,7 @@ def test_intake_endpoint():
         meets_requirements = (
             'normalized_items' in response_data and
             len(response_data['normalized_items']) > 0 and
-            all('sustainability_metrics' in item for item in response_data['normalized_items'])
+            all_have_metrics
         )
         
         if meets_requirements:
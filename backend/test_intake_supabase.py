@@ -3,9 +3,34 @@
 Test script to verify that quiz results are being saved to Supabase via the /api/intake endpoint
 """
 
+import atexit
 import requests
 import json
+import sys
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+
+try:
+    import orjson
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(data):
+        return json.dumps(data).encode("utf-8")
+    _json_loads = json.loads
+
+INTAKE_URL = "http://localhost:8000/api/intake"
+
+# Concurrent requests in flight during the load test (matches the pool size)
+MAX_CONCURRENT_REQUESTS = 20
+
+# One pooled session so repeated calls reuse the keep-alive connection
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=20))
+SESSION.headers["Connection"] = "keep-alive"
+atexit.register(SESSION.close)
 
 # Test data matching what the frontend sends
 test_quiz_data = {
@@ -64,19 +89,23 @@ test_quiz_data = {
     "user_id": None
 }
 
+# Serialized once; load-test requests only swap in their own session_id bytes
+_QUIZ_TEMPLATE = _json_dumps(test_quiz_data)
+_TEMPLATE_SESSION_ID = test_quiz_data["session_id"].encode("utf-8")
+
 def test_intake_endpoint():
     """Test the /api/intake endpoint to ensure it saves to Supabase"""
-    url = "http://localhost:8000/api/intake"
+    url = INTAKE_URL
     
     print("🧪 Testing /api/intake endpoint with Supabase integration...")
     print(f"📨 Sending test quiz data with session ID: {test_quiz_data['session_id']}")
     
     try:
-        response = requests.post(url, json=test_quiz_data)
+        response = SESSION.post(url, json=test_quiz_data)
         
         if response.status_code == 200:
             print("✅ /api/intake request successful!")
-            result = response.json()
+            result = _json_loads(response.content)
             
             # Print key results
             if "scoring_result" in result:
@@ -94,5 +123,40 @@ def test_intake_endpoint():
     except Exception as e:
         print(f"❌ Error testing endpoint: {e}")
 
+def post_quiz_session(session_id):
+    """POST the test quiz under its own session ID; returns the HTTP status (None on error)"""
+    body = _QUIZ_TEMPLATE.replace(_TEMPLATE_SESSION_ID, session_id.encode("utf-8"), 1)
+    try:
+        return SESSION.post(INTAKE_URL, data=body, headers={"Content-Type": "application/json"},
+                            timeout=30).status_code
+    except requests.exceptions.RequestException:
+        return None
+
+def test_intake_load(count):
+    """Submit `count` quiz sessions concurrently over the pooled session"""
+    session_ids = [f"test_session_{uuid.uuid4().hex[:8]}" for _ in range(count)]
+    
+    print(f"🧪 Load testing /api/intake with {count} concurrent sessions...")
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=min(count, MAX_CONCURRENT_REQUESTS)) as pool:
+        statuses = list(pool.map(post_quiz_session, session_ids))
+    elapsed = time.perf_counter() - started
+    
+    succeeded = statuses.count(200)
+    print(f"✅ {succeeded}/{count} requests succeeded in {elapsed:.2f}s ({count / elapsed:.1f} req/s)")
+    if succeeded < count:
+        print(f"❌ Failed statuses: {[status for status in statuses if status != 200]}")
+    return succeeded == count
+
 if __name__ == "__main__":
-    test_intake_endpoint()
+    # Optional argument: number of concurrent sessions for a load test
+    if len(sys.argv) > 1:
+        try:
+            count = int(sys.argv[1])
+        except ValueError:
+            count = 0
+        if count <= 0:
+            sys.exit(f"❌ Session count must be a positive integer, got {sys.argv[1]!r}")
+        test_intake_load(count)
+    else:
+        test_intake_endpoint()
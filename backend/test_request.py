@@ -1,5 +1,20 @@
+import atexit
 import requests
 import json
+from requests.adapters import HTTPAdapter
+
+# Parse response bytes directly with orjson when installed
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# One pooled session so repeated calls reuse the keep-alive connection
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=20))
+SESSION.headers["Connection"] = "keep-alive"
+atexit.register(SESSION.close)
 
 # Test data that matches what frontend sends
 test_data = {
@@ -17,7 +32,7 @@ test_data = {
 }
 
 try:
-    response = requests.post(
+    response = SESSION.post(
         "http://localhost:8000/api/intake",
         headers={"Content-Type": "application/json"},
         json=test_data,
@@ -30,7 +45,7 @@ try:
     
     if response.status_code == 422:
         print("\n❌ Validation Error Details:")
-        error_data = response.json()
+        error_data = _json_loads(response.content)
         for error in error_data.get("detail", []):
             print(f"  - Field: {error.get('loc', 'Unknown')}")
             print(f"    Error: {error.get('msg', 'Unknown error')}")